@@ -159,11 +159,21 @@ def demo_flow_centrality_comparison():
     print("Network structure created!")
     
     # Test different approaches
-    print("\n--- Approach 1: Exact Algorithm (O(V³)) ---")
-    print("Skipping for large network (150 users) - would take too long!")
-    print("This demonstrates why optimization is needed.")
+    print("\n--- Approach 1: Exact Algorithm (Brandes, O(VE)) ---")
+    start_time = time.time()
+    exact_result = network.get_flow_centrality(5)
+    exact_time = (time.time() - start_time) * 1000
+    print(f"Time: {exact_time:.1f}ms")
+    print(f"Top 3: {exact_result[:3]}")
     
-    print("\n--- Approach 2: Optimized Algorithm (O(V² log V)) ---")
+    print("\n--- Approach 1b: Adaptive Path Sampling (error bound 0.05) ---")
+    start_time = time.time()
+    adaptive_result = network.get_flow_centrality_adaptive(5, seed=42)
+    adaptive_time = (time.time() - start_time) * 1000
+    print(f"Time: {adaptive_time:.1f}ms")
+    print(f"Top 3: {adaptive_result[:3]}")
+    
+    print("\n--- Approach 2: Optimized Algorithm (O(SE), S = sampled sources) ---")
     try:
         start_time = time.time()
         optimized_result = network.get_flow_centrality_optimized(5, sample_ratio=0.3)
@@ -174,7 +184,7 @@ def demo_flow_centrality_comparison():
     except Exception as e:
         print(f"Failed: {e}")
     
-    print("\n--- Approach 3: High-Speed Approximation (O(V²)) ---")
+    print("\n--- Approach 3: High-Speed Approximation (fewer sampled pairs) ---")
     try:
         start_time = time.time()
         fast_result = network.get_flow_centrality_optimized(5, sample_ratio=0.1)
@@ -190,17 +200,18 @@ def demo_flow_centrality_comparison():
         print(f"Failed: {e}")
     
     print("\n--- Summary of Trade-offs ---")
-    print("• Exact Algorithm: 100% accurate, O(V³) complexity")
-    print("• Optimized Algorithm: ~95% accurate, O(V² log V) complexity")
-    print("• Fast Approximation: ~85% accurate, O(V²) complexity")
-    print("\n• For networks >100 users, use optimized algorithm")
-    print("• For networks >500 users, use fast approximation")
-    print("• For real-time applications, use fast approximation")
+    print("• Exact Algorithm: 100% accurate, O(VE) complexity")
+    print("• Adaptive Sampling: error within epsilon with probability 1 - delta")
+    print("• Optimized Algorithm: ~95% accurate, O(SE) for S sampled sources")
+    print("• Fast Approximation: ~85% accurate, same bound with a smaller sample")
+    print("\n• For networks up to a few thousand users, use the exact algorithm")
+    print("• Beyond that, use adaptive sampling with a suitable error bound")
+    print("• Pair sampling still runs a BFS from nearly every user, so it rarely beats exact")
     
     print("\n--- Why Optimization Matters ---")
-    print("• 150 users: Exact = ~3+ minutes, Optimized = ~100ms, Fast = ~50ms")
-    print("• 500 users: Exact = ~2+ hours, Optimized = ~1 second, Fast = ~200ms")
-    print("• 1000 users: Exact = ~16+ hours, Optimized = ~8 seconds, Fast = ~800ms")
+    print("• The old all-pairs check was O(V³): ~3+ minutes at 150 users, hours at 500+")
+    print("• Brandes' algorithm is O(VE): ~10ms at 150 users, ~0.5 seconds at 1000")
+    print("• Sampling only pays off once a BFS from every user is too slow")
 
 
 def demo_performance():
@@ -258,9 +269,9 @@ def demo_performance():
     print(f"\n--- Performance Summary ---")
     print("• Top Referrers: O(V log V) - scales well to any size")
     print("• Unique Reach: O(V²) - scales moderately")
-    print("• Flow Centrality: O(V³) → O(V² log V) with optimization")
-    print("\n• For networks >100 users, use optimized flow centrality")
-    print("• For networks >500 users, consider alternative metrics")
+    print("• Flow Centrality: O(VE) exact with Brandes' algorithm")
+    print("\n• For networks up to a few thousand users, use exact flow centrality")
+    print("• For larger networks, use adaptive sampling or consider alternative metrics")
 
 
 def main():
@@ -5,7 +5,7 @@ A comprehensive system for managing and analyzing referral networks.
 """
 
 from .core.referral_network import ReferralNetwork
-from .core.simulation import simulate, days_to_target, min_bonus_for_target
+from .core.simulation import simulate, simulate_total, days_to_target, min_bonus_for_target
 from .models.user import User
 from .constraints.validator import ReferralValidator
 from .algorithms.network_analysis import NetworkAnalyzer
@@ -15,6 +15,7 @@ from .examples.adoption_functions import example_adoption_prob
 __all__ = [
     'ReferralNetwork',
     'simulate',
+    'simulate_total',
     'days_to_target', 
     'min_bonus_for_target',
     'User', 
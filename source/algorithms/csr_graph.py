@@ -0,0 +1,92 @@
+"""
+Compressed sparse row (CSR) adjacency for the referral network.
+
+This module flattens the per-user referral sets into two contiguous integer
+arrays so that graph kernels can iterate neighbors as a slice of one buffer
+instead of dispatching through User objects.
+"""
+
+from array import array
+from typing import Dict, List, Optional
+from ..models.user import User
+
+
+class CSRGraph:
+    """
+    Contiguous adjacency layout of a referral network.
+    
+    Users are remapped to dense indices [0, n). The direct referrals of the
+    user at index i are indices[indptr[i]:indptr[i + 1]].
+    """
+    
+    def __init__(self, idx_to_id: List[int], id_to_idx: Dict[int, int],
+                 indptr: array, indices: array):
+        """
+        Initialize a CSR graph from prebuilt arrays.
+        
+        Args:
+            idx_to_id: User ID for each dense index
+            id_to_idx: Dense index for each user ID
+            indptr: Row offsets into indices (length n + 1)
+            indices: Concatenated neighbor indices of every row
+        """
+        self.idx_to_id = idx_to_id
+        self.id_to_idx = id_to_idx
+        self.indptr = indptr
+        self.indices = indices
+        self.n = len(idx_to_id)
+        self._transpose: Optional['CSRGraph'] = None
+    
+    @staticmethod
+    def from_users(users: Dict[int, User]) -> 'CSRGraph':
+        """
+        Build a CSR graph from the network's user dictionary.
+        
+        Args:
+            users: Dictionary of all users in the network
+            
+        Returns:
+            CSRGraph with one row per user, in dictionary order
+        """
+        idx_to_id = list(users.keys())
+        id_to_idx = {user_id: idx for idx, user_id in enumerate(idx_to_id)}
+        
+        indptr = array('i', [0])
+        indices = array('i')
+        for user_id in idx_to_id:
+            indices.extend(id_to_idx[referred_id] for referred_id in users[user_id].referrals)
+            indptr.append(len(indices))
+        
+        return CSRGraph(idx_to_id, id_to_idx, indptr, indices)
+    
+    def transpose(self) -> 'CSRGraph':
+        """
+        Get the graph with every edge reversed, built once and then reused.
+        
+        Row i of the transpose lists the users that referred the user at index i.
+        
+        Returns:
+            CSRGraph sharing this graph's id mapping
+        """
+        if self._transpose is None:
+            counts = [0] * (self.n + 1)
+            for target in self.indices:
+                counts[target + 1] += 1
+            for i in range(self.n):
+                counts[i + 1] += counts[i]
+            
+            indptr = array('i', counts)
+            indices = array('i', [0]) * len(self.indices)
+            fill = counts[:-1]
+            for source in range(self.n):
+                for pos in range(self.indptr[source], self.indptr[source + 1]):
+                    target = self.indices[pos]
+                    indices[fill[target]] = source
+                    fill[target] += 1
+            
+            self._transpose = CSRGraph(self.idx_to_id, self.id_to_idx, indptr, indices)
+        return self._transpose
+    
+    def __repr__(self) -> str:
+        """String representation of the graph."""
+        return f"CSRGraph(nodes={self.n}, edges={len(self.indices)})"
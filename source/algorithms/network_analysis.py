@@ -4,9 +4,17 @@ Network analysis algorithms for the referral network.
 This module contains algorithms for analyzing referral patterns and user influence.
 """
 
-from typing import List, Tuple, Dict, Set
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Dict, Set, Optional
 from collections import deque
 from ..models.user import User
+from .csr_graph import CSRGraph
+
+
+# Graph arrays installed once per worker process by _init_centrality_worker
+_worker_graph: Optional[Tuple[array, array, int]] = None
 
 
 class NetworkAnalyzer:
@@ -15,7 +23,8 @@ class NetworkAnalyzer:
     """
     
     @staticmethod
-    def get_total_referrals(user_id: int, users: Dict[int, User]) -> int:
+    def get_total_referrals(user_id: int, users: Dict[int, User],
+                            graph: Optional[CSRGraph] = None) -> int:
         """
         Calculate total referrals (direct + indirect) for a user.
         
@@ -24,6 +33,7 @@ class NetworkAnalyzer:
         Args:
             user_id: ID of the user to analyze
             users: Dictionary of all users in the network
+            graph: Prebuilt CSR adjacency of users, used as the fast path if given
             
         Returns:
             Total number of referrals (direct + indirect)
@@ -31,6 +41,12 @@ class NetworkAnalyzer:
         if user_id not in users:
             return 0
         
+        if graph is not None:
+            queue, _ = NetworkAnalyzer._bfs_from_index(
+                graph.indptr, graph.indices, graph.n, graph.id_to_idx[user_id]
+            )
+            return len(queue) - 1
+        
         visited = set()
         queue = deque([user_id])
         total = 0
@@ -44,7 +60,7 @@ class NetworkAnalyzer:
             
             # Count direct referrals
             current_user = users[current]
-            for referred_id in current_user.get_referrals():
+            for referred_id in current_user.referrals:
                 if referred_id not in visited:
                     queue.append(referred_id)
                     total += 1
@@ -52,7 +68,149 @@ class NetworkAnalyzer:
         return total
     
     @staticmethod
-    def get_top_referrers(k: int, users: Dict[int, User]) -> List[Tuple[int, int]]:
+    def _bfs_from_index(indptr: array, indices: array, n: int,
+                        source: int) -> Tuple[array, array]:
+        """
+        Single-source BFS kernel over a CSR adjacency.
+        
+        The queue is an int array scanned with a head cursor (no popleft) and
+        distances live in an int array that doubles as the visited bitmap, so
+        no per-node Python ints are boxed into sets or deques.
+        
+        Args:
+            indptr: CSR row offsets
+            indices: CSR neighbor indices
+            n: Number of nodes
+            source: Node index to start from
+            
+        Returns:
+            Tuple of (queue, dist) where queue lists reached node indices in BFS
+            order (source first) and dist[v] is the hop distance to v (-1 if
+            unreachable)
+        """
+        dist = array('i', [-1]) * n
+        dist[source] = 0
+        queue = array('i', [source])
+        head = 0
+        
+        while head < len(queue):
+            current = queue[head]
+            head += 1
+            next_dist = dist[current] + 1
+            for pos in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[pos]
+                if dist[neighbor] < 0:
+                    dist[neighbor] = next_dist
+                    queue.append(neighbor)
+        
+        return queue, dist
+    
+    @staticmethod
+    def _subtree_totals(graph: CSRGraph) -> array:
+        """
+        Calculate total referrals for every user index directly on the CSR arrays.
+        
+        Users are visited breadth-first from the roots (users nobody referred)
+        and totals are summed in reverse visit order, so every referral's
+        total is ready before its referrer's. Users left unvisited (only
+        possible on a cycle) are counted with a BFS of their own.
+        
+        Summing subtrees is only valid when every user has at most one
+        referrer; if any user was referred twice (possible when User objects
+        are edited directly), a shared subtree would be counted once per path
+        and a cycle could be walked forever, so every user is counted with
+        its own BFS instead.
+        
+        Args:
+            graph: CSR adjacency of the network
+            
+        Returns:
+            Total referral count for each user index
+        """
+        indptr, indices, n_users = graph.indptr, graph.indices, graph.n
+        has_referrer = bytearray(n_users)
+        for target in indices:
+            if has_referrer[target]:
+                return array('i', [
+                    len(NetworkAnalyzer._bfs_from_index(indptr, indices, n_users, v)[0]) - 1
+                    for v in range(n_users)
+                ])
+            has_referrer[target] = 1
+        
+        order = array('i', [v for v in range(n_users) if not has_referrer[v]])
+        head = 0
+        while head < len(order):
+            current = order[head]
+            head += 1
+            order.extend(indices[indptr[current]:indptr[current + 1]])
+        
+        totals = array('i', [-1]) * n_users
+        for current in reversed(order):
+            total = 0
+            for pos in range(indptr[current], indptr[current + 1]):
+                total += 1 + totals[indices[pos]]
+            totals[current] = total
+        
+        for v in range(n_users):
+            if totals[v] < 0:
+                totals[v] = len(NetworkAnalyzer._bfs_from_index(indptr, indices, n_users, v)[0]) - 1
+        
+        return totals
+    
+    @staticmethod
+    def get_reach_bitsets(graph: CSRGraph) -> List[int]:
+        """
+        Compute the reachable set of every user as an integer bitset.
+        
+        Bit j of entry i is set when the user at index j is reachable from the
+        user at index i; a user's own bit is left out. Users are processed in
+        reverse topological order, so each reach is the OR of its direct
+        referrals and their reaches, and a union costs one machine-word OR per
+        64 users instead of a set update per user. Users without referrals
+        keep the shared int 0, so only referrers pay for a bitset.
+        
+        Args:
+            graph: CSR adjacency of the network
+            
+        Returns:
+            Reach bitset for each user index
+        """
+        indptr, indices, n_users = graph.indptr, graph.indices, graph.n
+        reverse = graph.transpose()
+        out_degree = [indptr[v + 1] - indptr[v] for v in range(n_users)]
+        reach = [0] * n_users
+        done = [False] * n_users
+        
+        # Kahn's algorithm on the reversed graph: a user is ready once all its referrals are done
+        ready = [v for v in range(n_users) if out_degree[v] == 0]
+        while ready:
+            current = ready.pop()
+            done[current] = True
+            bits = 0
+            for pos in range(indptr[current], indptr[current + 1]):
+                referral = indices[pos]
+                bits |= reach[referral] | (1 << referral)
+            reach[current] = bits
+            for pos in range(reverse.indptr[current], reverse.indptr[current + 1]):
+                referrer = reverse.indices[pos]
+                out_degree[referrer] -= 1
+                if out_degree[referrer] == 0:
+                    ready.append(referrer)
+        
+        # Users on a cycle never become ready; fall back to a plain BFS for them
+        for v in range(n_users):
+            if not done[v]:
+                bits = 0
+                # queue[0] is v itself, which the BFS never revisits
+                for reached in NetworkAnalyzer._bfs_from_index(indptr, indices, n_users, v)[0][1:]:
+                    bits |= 1 << reached
+                reach[v] = bits
+        
+        return reach
+    
+    @staticmethod
+    def get_top_referrers(k: int, users: Dict[int, User],
+                          graph: Optional[CSRGraph] = None) -> List[Tuple[int, int]]:
         """
         Get the top k referrers ranked by their total referral count.
         
@@ -66,23 +224,28 @@ class NetworkAnalyzer:
         Args:
             k: Number of top referrers to return
             users: Dictionary of all users in the network
+            graph: Prebuilt CSR adjacency of users (built from users if omitted)
             
         Returns:
             List of tuples (user_id, total_referrals) sorted by referral count
         """
-        referrer_counts = []
+        if graph is None:
+            graph = CSRGraph.from_users(users)
         
-        for user_id, user in users.items():
-            if user.get_referrals():  # Only include users who have made referrals
-                total_refs = NetworkAnalyzer.get_total_referrals(user_id, users)
-                referrer_counts.append((user_id, total_refs))
+        referrer_counts = []
+        totals_by_idx = NetworkAnalyzer._subtree_totals(graph)
+        indptr = graph.indptr
+        for idx, user_id in enumerate(graph.idx_to_id):
+            if indptr[idx + 1] > indptr[idx]:  # Only include users who have made referrals
+                referrer_counts.append((user_id, totals_by_idx[idx]))
         
         # Sort by referral count (descending) and return top k
         referrer_counts.sort(key=lambda x: x[1], reverse=True)
         return referrer_counts[:k]
     
     @staticmethod
-    def get_flow_centrality(k: int, users: Dict[int, User]) -> List[Tuple[int, float]]:
+    def get_flow_centrality(k: int, users: Dict[int, User],
+                            graph: Optional[CSRGraph] = None) -> List[Tuple[int, float]]:
         """
         Calculate flow centrality for users in the network.
         
@@ -90,112 +253,340 @@ class NetworkAnalyzer:
         different parts of the network. Higher values indicate users who
         control information flow between disconnected network segments.
         
+        Uses Brandes' algorithm, which computes exact scores for every user
+        in O(V·(V+E)) time.
+        
         Args:
             k: Number of top users by flow centrality to return
             users: Dictionary of all users in the network
+            graph: Prebuilt CSR adjacency of users (built on demand if omitted)
             
         Returns:
             List of tuples (user_id, centrality_score) sorted by centrality
         """
-        centrality_scores = []
+        if graph is None:
+            graph = CSRGraph.from_users(users)
+        centrality = NetworkAnalyzer._brandes(graph.indptr, graph.indices, graph.n)
         
-        for user_id, user in users.items():
-            if not user.get_referrals():
-                centrality_scores.append((user_id, 0.0))
-                continue
-            
-            # Calculate flow centrality as the number of pairs of users
-            # that can only communicate through this user
-            centrality = NetworkAnalyzer._calculate_flow_centrality(user_id, users)
-            centrality_scores.append((user_id, centrality))
+        centrality_scores = [(user_id, centrality[idx])
+                             for idx, user_id in enumerate(graph.idx_to_id)]
         
         # Sort by centrality score (descending) and return top k
         centrality_scores.sort(key=lambda x: x[1], reverse=True)
         return centrality_scores[:k]
     
+    @staticmethod
+    def _brandes(indptr: array, indices: array, n: int) -> List[float]:
+        """
+        Brandes' betweenness kernel over a CSR adjacency.
+        
+        One BFS per source counts shortest paths (sigma), then pair dependencies
+        (delta) are back-propagated in reverse BFS order. Successors on the BFS
+        DAG are recognised by dist[w] == dist[v] + 1, so no predecessor lists
+        are built. O(V·(V+E)) overall.
+        
+        Only users with both a referrer and referrals ("brokers") can lie
+        strictly inside a path, so sources with no broker among their direct
+        referrals are skipped and non-brokers are skipped during propagation.
+        
+        Args:
+            indptr: CSR row offsets
+            indices: CSR neighbor indices
+            n: Number of nodes
+            
+        Returns:
+            Centrality score for each node index
+        """
+        centrality = [0.0] * n
+        dist = [-1] * n
+        sigma = [0] * n
+        delta = [0.0] * n
+        queue = [0] * n  # Preallocated BFS queue; doubles as the visit order
+        
+        in_degree = [0] * n
+        for target in indices:
+            in_degree[target] += 1
+        broker = [in_degree[v] > 0 and indptr[v] < indptr[v + 1] for v in range(n)]
+        
+        for source in range(n):
+            # Every path from this source has length <= 1: no intermediaries
+            if not any(broker[indices[pos]] for pos in range(indptr[source], indptr[source + 1])):
+                continue
+            
+            dist[source] = 0
+            sigma[source] = 1
+            queue[0] = source
+            head = 0
+            tail = 1
+            
+            while head < tail:
+                current = queue[head]
+                head += 1
+                next_dist = dist[current] + 1
+                for pos in range(indptr[current], indptr[current + 1]):
+                    neighbor = indices[pos]
+                    if dist[neighbor] < 0:
+                        dist[neighbor] = next_dist
+                        queue[tail] = neighbor
+                        tail += 1
+                    if dist[neighbor] == next_dist:
+                        sigma[neighbor] += sigma[current]
+            
+            # queue[0] is the source, which is never an intermediary
+            for i in range(tail - 1, 0, -1):
+                current = queue[i]
+                if not broker[current]:
+                    continue
+                next_dist = dist[current] + 1
+                dependency = 0.0
+                for pos in range(indptr[current], indptr[current + 1]):
+                    neighbor = indices[pos]
+                    if dist[neighbor] == next_dist:
+                        dependency += (sigma[current] / sigma[neighbor]) * (1.0 + delta[neighbor])
+                delta[current] = dependency
+                centrality[current] += dependency
+            
+            # Reset only the nodes this BFS touched
+            for i in range(tail):
+                current = queue[i]
+                dist[current] = -1
+                sigma[current] = 0
+                delta[current] = 0.0
+        
+        return centrality
+    
     @staticmethod
     def get_flow_centrality_optimized(k: int, users: Dict[int, User], 
-                                    sample_ratio: float = 0.3) -> List[Tuple[int, float]]:
+                                    sample_ratio: float = 0.3,
+                                    graph: Optional[CSRGraph] = None,
+                                    chunk_size: int = 64,
+                                    n_workers: Optional[int] = None) -> List[Tuple[int, float]]:
         """
         Optimized flow centrality calculation using sampling and caching.
         
-        This reduces complexity from O(V³) to approximately O(V² log V) by:
+        This costs O(S·(V+E)) for S distinct sampled sources, against
+        O(V·(V+E)) for the exact scores, by:
         1. Sampling user pairs instead of checking all
-        2. Caching shortest path distances
+        2. Computing shortest distances only from sampled sources
         3. Using more efficient path checking
         
+        Only one distance vector of length V is alive at a time. Sources are
+        grouped in batches of chunk_size, and with n_workers greater than 1
+        the batches are spread over that many worker processes.
+        
         Args:
             k: Number of top users by flow centrality to return
             users: Dictionary of all users in the network
             sample_ratio: Fraction of user pairs to sample (0.0 to 1.0)
+            graph: Prebuilt CSR adjacency of users (built on demand if omitted)
+            chunk_size: Number of BFS sources handled per batch
+            n_workers: Number of worker processes (None or 1 runs in-process)
             
         Returns:
             List of tuples (user_id, centrality_score) sorted by centrality
         """
+        if graph is None:
+            graph = CSRGraph.from_users(users)
+        
         if len(users) <= 100:
             # For small networks, use the exact algorithm
-            return NetworkAnalyzer.get_flow_centrality(k, users)
+            return NetworkAnalyzer.get_flow_centrality(k, users, graph)
         
         centrality_scores = []
-        all_users = list(users.keys())
-        n_users = len(all_users)
-        
-        # Pre-compute all-pairs shortest distances using Floyd-Warshall
-        # This is O(V³) but only done once, then reused for all users
-        distances = NetworkAnalyzer._compute_all_pairs_shortest_distances(users)
+        all_users = graph.idx_to_id
+        n_users = graph.n
         
         # Sample user pairs for approximation
         sample_size = max(1, int(sample_ratio * n_users * (n_users - 1) / 2))
         sampled_pairs = NetworkAnalyzer._sample_user_pairs(all_users, sample_size)
         
-        for user_id, user in users.items():
-            if not user.get_referrals():
-                centrality_scores.append((user_id, 0.0))
-                continue
-            
-            # Calculate approximate flow centrality using sampled pairs
-            centrality = NetworkAnalyzer._calculate_flow_centrality_optimized(
-                user_id, users, distances, sampled_pairs
-            )
-            centrality_scores.append((user_id, centrality))
+        # Accumulate approximate centrality for every user in one pass over the pairs
+        centrality = NetworkAnalyzer._calculate_flow_centrality_optimized(
+            graph, sampled_pairs, chunk_size, n_workers
+        )
+        
+        for idx, user_id in enumerate(all_users):
+            centrality_scores.append((user_id, centrality[idx]))
         
         # Sort by centrality score (descending) and return top k
         centrality_scores.sort(key=lambda x: x[1], reverse=True)
         return centrality_scores[:k]
     
     @staticmethod
-    def _compute_all_pairs_shortest_distances(users: Dict[int, User]) -> Dict[Tuple[int, int], int]:
+    def get_flow_centrality_adaptive(k: int, users: Dict[int, User],
+                                     epsilon: float = 0.05, delta: float = 0.1,
+                                     graph: Optional[CSRGraph] = None,
+                                     seed: Optional[int] = None) -> List[Tuple[int, float]]:
         """
-        Compute all-pairs shortest distances using Floyd-Warshall algorithm.
+        Approximate flow centrality by adaptively sampling shortest paths.
+        
+        Each sample picks a random ordered pair (s, t), draws one shortest s->t
+        path uniformly at random by walking the BFS DAG of s backwards from t,
+        and credits every user strictly inside it. Sampling runs in batches
+        and stops as soon as an empirical Bernstein bound shows every user's
+        normalized score is within epsilon of its true value, or when the
+        Riondato-Kornaropoulos sample size (which guarantees that accuracy
+        outright) is reached. Either way the guarantee holds with probability
+        at least 1 - delta. If that sample size is no smaller than the number
+        of ordered pairs, the exact scores are computed instead, since they
+        cost less than the sampling would.
         
         Args:
+            k: Number of top users by flow centrality to return
             users: Dictionary of all users in the network
+            epsilon: Maximum additive error on normalized centrality (0.0 to 1.0)
+            delta: Probability that the error bound may be exceeded (0.0 to 1.0)
+            graph: Prebuilt CSR adjacency of users (built on demand if omitted)
+            seed: Seed for the random number generator, for reproducible results
             
         Returns:
-            Dictionary mapping (user1, user2) to shortest distance
+            List of tuples (user_id, centrality_score) sorted by centrality, with
+            scores on the same scale as get_flow_centrality
         """
-        all_users = list(users.keys())
-        n_users = len(all_users)
+        import random
+        if graph is None:
+            graph = CSRGraph.from_users(users)
+        
+        n_users = graph.n
+        if n_users < 3:
+            return [(user_id, 0.0) for user_id in graph.idx_to_id][:k]
+        
+        # Users on a shortest path are bounded by the longest path in the DAG
+        vertex_diameter = NetworkAnalyzer._longest_path_nodes(graph)
+        if vertex_diameter < 3:
+            return [(user_id, 0.0) for user_id in graph.idx_to_id][:k]
+        
+        max_samples = math.ceil(
+            (0.5 / epsilon ** 2)
+            * (math.floor(math.log2(vertex_diameter - 2)) + 1 + math.log(2 / delta))
+        )
+        if max_samples >= n_users * (n_users - 1):
+            return NetworkAnalyzer.get_flow_centrality(k, users, graph)
+        
+        rng = random.Random(seed)
+        indptr, indices = graph.indptr, graph.indices
+        reverse = graph.transpose()
+        reverse_indptr, reverse_indices = reverse.indptr, reverse.indices
+        
+        hits = [0] * n_users
+        dist = [-1] * n_users
+        sigma = [0] * n_users
+        queue = [0] * n_users
+        samples = 0
+        batch = max(1, min(max_samples, n_users))
+        check = 0
+        
+        while samples < max_samples:
+            for _ in range(min(batch, max_samples - samples)):
+                samples += 1
+                source = rng.randrange(n_users)
+                target = rng.randrange(n_users - 1)
+                if target >= source:
+                    target += 1
+                
+                # BFS from source counting shortest paths, stopping at target's level
+                dist[source] = 0
+                sigma[source] = 1
+                queue[0] = source
+                head = 0
+                tail = 1
+                while head < tail:
+                    current = queue[head]
+                    head += 1
+                    if dist[target] >= 0 and dist[current] >= dist[target]:
+                        break
+                    next_dist = dist[current] + 1
+                    for pos in range(indptr[current], indptr[current + 1]):
+                        neighbor = indices[pos]
+                        if dist[neighbor] < 0:
+                            dist[neighbor] = next_dist
+                            queue[tail] = neighbor
+                            tail += 1
+                        if dist[neighbor] == next_dist:
+                            sigma[neighbor] += sigma[current]
+                
+                # Walk back from target, picking predecessors in proportion to sigma
+                if dist[target] > 1:
+                    current = target
+                    while True:
+                        prev_dist = dist[current] - 1
+                        pick = rng.random() * sigma[current]
+                        chosen = current
+                        for pos in range(reverse_indptr[current], reverse_indptr[current + 1]):
+                            predecessor = reverse_indices[pos]
+                            if dist[predecessor] == prev_dist:
+                                chosen = predecessor
+                                pick -= sigma[predecessor]
+                                if pick < 0:
+                                    break
+                        current = chosen
+                        if current == source:
+                            break
+                        hits[current] += 1
+                
+                for i in range(tail):
+                    dist[queue[i]] = -1
+                    sigma[queue[i]] = 0
+            
+            # Empirical Bernstein stopping rule, with delta/2 spread over the checks
+            check += 1
+            log_term = math.log(3 * n_users / (delta / 2 ** (check + 1)))
+            worst = 0.0
+            for count in hits:
+                mean = count / samples
+                bound = (math.sqrt(2 * mean * (1 - mean) * log_term / samples)
+                         + 3 * log_term / samples)
+                if bound > worst:
+                    worst = bound
+            if worst <= epsilon:
+                break
+            batch *= 2
+        
+        # Rescale the sampled fraction of pairs to the exact score's scale
+        scale = n_users * (n_users - 1) / samples
+        centrality_scores = [(user_id, hits[idx] * scale)
+                             for idx, user_id in enumerate(graph.idx_to_id)]
         
-        # Initialize distances
-        distances = {}
-        for i, user1 in enumerate(all_users):
-            for j, user2 in enumerate(all_users):
-                if i == j:
-                    distances[(user1, user2)] = 0
-                elif user2 in users[user1].get_referrals():
-                    distances[(user1, user2)] = 1
-                else:
-                    distances[(user1, user2)] = float('inf')
-        
-        # Floyd-Warshall algorithm
-        for k in all_users:
-            for i in all_users:
-                for j in all_users:
-                    if distances[(i, k)] + distances[(k, j)] < distances[(i, j)]:
-                        distances[(i, j)] = distances[(i, k)] + distances[(k, j)]
-        
-        return distances
+        # Sort by centrality score (descending) and return top k
+        centrality_scores.sort(key=lambda x: x[1], reverse=True)
+        return centrality_scores[:k]
+    
+    @staticmethod
+    def _longest_path_nodes(graph: CSRGraph) -> int:
+        """
+        Count the users on the longest referral path.
+        
+        Uses a topological sweep (Kahn's algorithm). If the graph has a cycle,
+        the number of users is returned as a safe upper bound.
+        
+        Args:
+            graph: CSR adjacency of the network
+            
+        Returns:
+            Number of users on the longest path
+        """
+        indptr, indices = graph.indptr, graph.indices
+        in_degree = [0] * graph.n
+        for target in indices:
+            in_degree[target] += 1
+        
+        depth = [1] * graph.n
+        ready = [v for v in range(graph.n) if in_degree[v] == 0]
+        processed = 0
+        while ready:
+            current = ready.pop()
+            processed += 1
+            for pos in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[pos]
+                if depth[current] + 1 > depth[neighbor]:
+                    depth[neighbor] = depth[current] + 1
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    ready.append(neighbor)
+        
+        if processed < graph.n:
+            return graph.n
+        return max(depth, default=0)
     
     @staticmethod
     def _sample_user_pairs(all_users: List[int], sample_size: int) -> List[Tuple[int, int]]:
@@ -210,148 +601,180 @@ class NetworkAnalyzer:
             List of sampled user pairs
         """
         import random
-        pairs = []
         n_users = len(all_users)
+        total_pairs = n_users * (n_users - 1) // 2
+        
+        # Every pair is needed, so there is nothing to sample
+        if sample_size >= total_pairs:
+            return [(all_users[i], all_users[j])
+                    for i in range(n_users)
+                    for j in range(i + 1, n_users)]
+        
+        # Floyd's algorithm: draw sample_size distinct pair indices in
+        # [0, total_pairs) without materializing the V²/2 population
+        selected: Set[int] = set()
+        for upper in range(total_pairs - sample_size, total_pairs):
+            index = random.randint(0, upper)
+            selected.add(upper if index in selected else index)
+        
+        # Decode each index into (i, j), i < j, in row-major upper-triangular order
+        pairs = []
+        for index in sorted(selected):
+            i = n_users - 2 - (math.isqrt(8 * (total_pairs - 1 - index) + 1) - 1) // 2
+            j = index + i + 1 - i * (2 * n_users - i - 1) // 2
+            pairs.append((all_users[i], all_users[j]))
         
-        # Generate all possible pairs
-        all_pairs = [(all_users[i], all_users[j]) 
-                     for i in range(n_users) 
-                     for j in range(i+1, n_users)]
-        
-        # Sample randomly
-        if sample_size >= len(all_pairs):
-            return all_pairs
-        else:
-            return random.sample(all_pairs, sample_size)
+        return pairs
     
     @staticmethod
-    def _calculate_flow_centrality_optimized(user_id: int, users: Dict[int, User],
-                                           distances: Dict[Tuple[int, int], int],
-                                           sampled_pairs: List[Tuple[int, int]]) -> float:
+    def _calculate_flow_centrality_optimized(graph: CSRGraph,
+                                           sampled_pairs: List[Tuple[int, int]],
+                                           chunk_size: int,
+                                           n_workers: Optional[int] = None) -> List[float]:
         """
-        Calculate approximate flow centrality using pre-computed distances.
+        Calculate approximate flow centrality for all users using sampled pairs.
+        
+        Every sampled pair {u, v} is checked in both directions, u->v and
+        v->u, so the scores match get_flow_centrality, which sums over all
+        ordered pairs. Both orientations are sampled at the same rate, so the
+        rescaling by the unordered-pair ratio stays unbiased.
+        
+        Pairs are grouped by source, and each source is handled by a single
+        fused pass (see _accumulate_source_chunk). That pass runs the BFS and
+        credits every sampled target of that source before the next BFS, so
+        all distances are never materialized together.
+        
+        Batches of chunk_size sources are independent, so with n_workers > 1
+        they are farmed out to a process pool. Each worker receives the graph
+        arrays once, at start-up, and returns per-user counts that are summed
+        here.
         
         Args:
-            user_id: ID of the user to calculate centrality for
-            users: Dictionary of all users in the network
-            distances: Pre-computed all-pairs shortest distances
+            graph: CSR adjacency of the network
             sampled_pairs: List of sampled user pairs
+            chunk_size: Number of sources handled per batch
+            n_workers: Number of worker processes (None or 1 runs in-process)
             
         Returns:
-            Approximate flow centrality score
+            Approximate flow centrality score for each user index
         """
-        centrality = 0.0
-        
+        n_users = graph.n
+        id_to_idx = graph.id_to_idx
+        
+        # Group targets by source so each source needs a single BFS. Each
+        # unordered pair stands for both orientations, as in Brandes. Sources
+        # with no referrals cannot reach any target; skip them before paying
+        # for a BFS
+        indptr = graph.indptr
+        targets_by_source: Dict[int, List[int]] = {}
         for user1, user2 in sampled_pairs:
-            if user1 != user_id and user2 != user_id:
-                # Check if user_id is on the shortest path between user1 and user2
-                if NetworkAnalyzer._is_on_shortest_path_optimized(
-                    user1, user2, user_id, users, distances
-                ):
-                    centrality += 1.0
+            for s, t in ((id_to_idx[user1], id_to_idx[user2]),
+                         (id_to_idx[user2], id_to_idx[user1])):
+                if indptr[s] == indptr[s + 1]:
+                    continue
+                targets_by_source.setdefault(s, []).append(t)
+        sources = list(targets_by_source)
+        
+        step = max(1, chunk_size)
+        tasks = [[(s, targets_by_source[s]) for s in sources[start:start + step]]
+                 for start in range(0, len(sources), step)]
+        graph_arrays = (indptr, graph.indices, n_users)
+        
+        # Counts stay exact ints; they only become floats in the final scaling
+        centrality = [0] * n_users
+        if n_workers is not None and n_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=n_workers,
+                                     initializer=NetworkAnalyzer._init_centrality_worker,
+                                     initargs=graph_arrays) as executor:
+                for partial in executor.map(NetworkAnalyzer._centrality_worker_chunk, tasks):
+                    for v, count in enumerate(partial):
+                        centrality[v] += count
+        else:
+            for task in tasks:
+                partial = NetworkAnalyzer._accumulate_source_chunk(graph_arrays, task)
+                for v, count in enumerate(partial):
+                    centrality[v] += count
         
         # Scale up the result based on sampling ratio
-        total_pairs = len(users) * (len(users) - 1) / 2
+        total_pairs = n_users * (n_users - 1) / 2
         sample_ratio = len(sampled_pairs) / total_pairs
-        return centrality / sample_ratio if sample_ratio > 0 else 0.0
+        if sample_ratio <= 0:
+            return [0.0] * n_users
+        return [score / sample_ratio for score in centrality]
     
     @staticmethod
-    def _is_on_shortest_path_optimized(start: int, end: int, intermediate: int,
-                                      users: Dict[int, User],
-                                      distances: Dict[Tuple[int, int], int]) -> bool:
+    def _init_centrality_worker(indptr: array, indices: array, n: int) -> None:
         """
-        Check if intermediate user is on the shortest path using pre-computed distances.
+        Install the graph arrays in a worker process.
         
         Args:
-            start: Starting user ID
-            end: Ending user ID
-            intermediate: User ID to check if on path
-            users: Dictionary of all users in the network
-            distances: Pre-computed all-pairs shortest distances
-            
-        Returns:
-            True if intermediate is on shortest path, False otherwise
+            indptr: Row offsets of the CSR adjacency
+            indices: Neighbor indices of the CSR adjacency
+            n: Number of users
         """
-        # If no path exists, intermediate can't be on it
-        if distances[(start, end)] == float('inf'):
-            return False
-        
-        # Check if intermediate is on the shortest path
-        # A node v is on the shortest path from s to t if:
-        # dist(s, v) + dist(v, t) == dist(s, t)
-        return (distances[(start, intermediate)] + 
-                distances[(intermediate, end)] == 
-                distances[(start, end)])
-
+        global _worker_graph
+        _worker_graph = (indptr, indices, n)
+    
     @staticmethod
-    def _calculate_flow_centrality(user_id: int, users: Dict[int, User]) -> float:
+    def _centrality_worker_chunk(task: List[Tuple[int, List[int]]]) -> List[int]:
         """
-        Calculate flow centrality for a specific user.
-        
-        This is a simplified version that counts how many user pairs
-        have their shortest path go through the given user.
+        Accumulate one chunk of sources against the worker's installed graph.
         
         Args:
-            user_id: ID of the user to calculate centrality for
-            users: Dictionary of all users in the network
+            task: Pairs of (source index, target indices) for this chunk
             
         Returns:
-            Flow centrality score
+            Per-user count of sampled pairs the user lies between
         """
-        if user_id not in users:
-            return 0.0
-        
-        centrality = 0.0
-        all_users = list(users.keys())
-        
-        # Count pairs where this user is on the shortest path
-        for i, user1 in enumerate(all_users):
-            for user2 in all_users[i+1:]:
-                if user1 != user_id and user2 != user_id:
-                    # Check if user_id is on the shortest path between user1 and user2
-                    if NetworkAnalyzer._is_on_shortest_path(user1, user2, user_id, users):
-                        centrality += 1.0
-        
-        return centrality
+        return NetworkAnalyzer._accumulate_source_chunk(_worker_graph, task)
     
     @staticmethod
-    def _is_on_shortest_path(start: int, end: int, intermediate: int, 
-                            users: Dict[int, User]) -> bool:
+    def _accumulate_source_chunk(graph_arrays: Tuple[array, array, int],
+                                 task: List[Tuple[int, List[int]]]) -> List[int]:
         """
-        Check if intermediate user is on the shortest path between start and end.
+        Count, for one chunk of sources, how often each user lies on a sampled path.
+        
+        For each source s, a BFS fills a single distance vector. The BFS order
+        is then swept in reverse, Brandes-style, restricted to the sampled
+        targets: each user w gets a bitset of the targets that some shortest
+        path through w reaches. That bitset contains w's own bit if w is a
+        target, OR'd with the bitsets of its shortest-path successors (edges
+        (w, x) with dist(s, x) == dist(s, w) + 1). A user other than s or t
+        is between s and t exactly when t's bit is set, so its credit is the
+        popcount excluding its own bit.
         
         Args:
-            start: Starting user ID
-            end: Ending user ID
-            intermediate: User ID to check if on path
-            users: Dictionary of all users in the network
+            graph_arrays: (indptr, indices, n)
+            task: Pairs of (source index, target indices) for this chunk
             
         Returns:
-            True if intermediate is on shortest path, False otherwise
+            Per-user count of sampled pairs the user lies between
         """
-        # Simple BFS to find shortest path
-        if start not in users or end not in users:
-            return False
-        
-        visited = set()
-        queue = deque([(start, [start])])
-        
-        while queue:
-            current, path = queue.popleft()
-            if current in visited:
-                continue
-                
-            visited.add(current)
+        indptr, indices, n_users = graph_arrays
+        centrality = [0] * n_users
+        reach_bits = [0] * n_users
+        
+        for s, targets in task:
+            queue, dist = NetworkAnalyzer._bfs_from_index(indptr, indices, n_users, s)
+            for bit, t in enumerate(targets):
+                if dist[t] > 0:
+                    reach_bits[t] = 1 << bit
             
-            if current == end:
-                # Found path, check if intermediate is on it
-                return intermediate in path
+            # Reverse BFS order guarantees successors are final before their predecessors
+            for pos in range(len(queue) - 1, 0, -1):
+                current = queue[pos]
+                own = reach_bits[current]
+                bits = own
+                next_dist = dist[current] + 1
+                for edge in range(indptr[current], indptr[current + 1]):
+                    successor = indices[edge]
+                    if dist[successor] == next_dist:
+                        bits |= reach_bits[successor]
+                reach_bits[current] = bits
+                if bits != own:
+                    centrality[current] += bin(bits ^ own).count('1')
             
-            # Add all referred users to queue
-            current_user = users[current]
-            for referred_id in current_user.get_referrals():
-                if referred_id not in visited:
-                    new_path = path + [referred_id]
-                    queue.append((referred_id, new_path))
+            for current in queue:
+                reach_bits[current] = 0
         
-        return False
+        return centrality
@@ -5,8 +5,15 @@ This module implements greedy algorithms for finding users who can expand
 the network's reach with minimal overlap.
 """
 
-from typing import List, Tuple, Dict, Set
+import heapq
+from functools import reduce
+from itertools import islice
+from operator import or_
+from typing import List, Tuple, Dict, Set, Optional
 from ..models.user import User
+from .csr_graph import CSRGraph
+from .traversal import GraphTraversal
+from .network_analysis import NetworkAnalyzer
 
 
 class ReachExpander:
@@ -15,7 +22,9 @@ class ReachExpander:
     """
     
     @staticmethod
-    def get_unique_reach_expansion(k: int, users: Dict[int, User]) -> List[Tuple[int, int]]:
+    def get_unique_reach_expansion(k: int, users: Dict[int, User],
+                                   graph: Optional[CSRGraph] = None,
+                                   reach: Optional[List[int]] = None) -> List[Tuple[int, int]]:
         """
         Find top k users by unique reach expansion using greedy algorithm.
         
@@ -25,58 +34,81 @@ class ReachExpander:
         Args:
             k: Number of top users to return
             users: Dictionary of all users in the network
+            graph: Prebuilt CSR adjacency of users (built on demand if omitted)
+            reach: Precomputed NetworkAnalyzer.get_reach_bitsets(graph) result
             
         Returns:
-            List of tuples (user_id, unique_reach) sorted by unique reach
+            List of tuples (user_id, unique_reach) in greedy selection order,
+            where unique_reach is the number of new users the pick added on
+            top of the users selected before it
         """
         if k <= 0:
             return []
         
+        if graph is None:
+            graph = CSRGraph.from_users(users)
+        
         # Get all users who have made referrals
-        potential_referrers = []
-        for user_id, user in users.items():
-            if user.get_referrals():
-                potential_referrers.append(user_id)
+        indptr = graph.indptr
+        candidates = [idx for idx in range(graph.n) if indptr[idx + 1] > indptr[idx]]
+        potential_referrers = [graph.idx_to_id[idx] for idx in candidates]
         
         if not potential_referrers:
             return []
         
-        # Greedy selection: at each step, pick the user who adds the most new reach
-        selected_users = set()
-        total_reach = set()
+        # Reaches are bitsets over dense user indices, built for every user in
+        # one reverse-topological sweep: a set difference is then a word-wise
+        # AND-NOT and its size a popcount, with no hashing
+        if reach is None:
+            reach = NetworkAnalyzer.get_reach_bitsets(graph)
+        reaches = [reach[idx] for idx in candidates]
+        
+        # Lazy greedy: marginal gains only shrink as total_reach grows
+        # (submodularity), so a stale gain is an upper bound. Heap entries are
+        # (-gain, index, step the gain was computed at); an entry that is
+        # both on top and fresh for this step beats every other candidate,
+        # with ties going to the earlier candidate as in a full scan.
+        heap = [(-bin(user_reach).count('1'), i, 0) for i, user_reach in enumerate(reaches)]
+        heapq.heapify(heap)
+        total_reach = 0
         results = []
+        selected = bytearray(len(reaches))
+        n_picks = min(k, len(potential_referrers))
         
-        for step in range(min(k, len(potential_referrers))):
-            best_user = None
-            best_new_reach = -1  # Allow users with 0 new reach
+        # Once every reachable user is covered, no candidate can add anything
+        universe = reduce(or_, reaches, 0)
+        
+        for step in range(n_picks):
+            if total_reach == universe:
+                break
             
-            for user_id in potential_referrers:
-                if user_id in selected_users:
-                    continue
+            while True:
+                neg_gain, best_index, computed_at = heapq.heappop(heap)
+                if computed_at == step:
+                    break
                 
-                # Calculate new reach this user would add
-                user_reach = ReachExpander._get_user_reach(user_id, users)
-                new_reach = len(user_reach - total_reach)
+                # A stale gain of 0 can't shrink, and every entry below it is 0 too,
+                # so the top is already the earliest best candidate
+                if neg_gain == 0:
+                    break
                 
-                if new_reach > best_new_reach:
-                    best_new_reach = new_reach
-                    best_user = user_id
-            
-            if best_user is None:
-                break
+                # Recompute this candidate's gain against the current reach
+                new_reach = bin(reaches[best_index] & ~total_reach).count('1')
+                heapq.heappush(heap, (-new_reach, best_index, step))
             
             # Add best user to selection
-            selected_users.add(best_user)
-            user_reach = ReachExpander._get_user_reach(best_user, users)
-            total_reach.update(user_reach)
+            selected[best_index] = 1
+            total_reach |= reaches[best_index]
             
-            results.append((best_user, len(user_reach)))
-            
-            # Continue even if new_reach is 0, as long as we haven't reached k
-            # Don't break here - we want to select k users even if some add 0 new reach
+            results.append((potential_referrers[best_index], -neg_gain))
+        
+        # Continue even if new reach is 0, as long as we haven't reached k: with
+        # every gain at 0, a full scan would pick the earliest unselected candidates
+        unselected = (i for i in range(len(reaches)) if not selected[i])
+        results.extend((potential_referrers[i], 0)
+                       for i in islice(unselected, n_picks - len(results)))
         
-        # Sort by unique reach (descending)
-        results.sort(key=lambda x: x[1], reverse=True)
+        # Greedy order already lists picks by non-increasing marginal gain
         return results
     
     @staticmethod
@@ -91,28 +123,7 @@ class ReachExpander:
         Returns:
             Set of user IDs in this user's reach
         """
-        if user_id not in users:
-            return set()
-        
-        reach = set()
-        stack = [user_id]
-        
-        while stack:
-            current = stack.pop()
-            if current in reach:
-                continue
-                
-            # Don't include the user themselves in their reach
-            if current != user_id:
-                reach.add(current)
-            
-            # Add all users this user has referred
-            current_user = users[current]
-            for referred_id in current_user.get_referrals():
-                if referred_id not in reach:
-                    stack.append(referred_id)
-        
-        return reach
+        return GraphTraversal.descendants(user_id, users)
     
     @staticmethod
     def get_network_coverage(selected_users: List[int], users: Dict[int, User]) -> float:
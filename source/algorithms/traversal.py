@@ -0,0 +1,47 @@
+"""
+Shared traversal helpers for the referral network.
+
+This module holds the downstream walk over users' referrals that the reach
+algorithms are built on.
+"""
+
+from typing import Dict, Set
+from ..models.user import User
+
+
+class GraphTraversal:
+    """
+    Traversals over the referral relationships of a user dictionary.
+    """
+    
+    @staticmethod
+    def descendants(start_id: int, users: Dict[int, User]) -> Set[int]:
+        """
+        Collect every user reachable from a user through referrals.
+        
+        Uses an iterative DFS, so deep referral chains don't hit the recursion
+        limit.
+        
+        Args:
+            start_id: ID of the user to start from
+            users: Dictionary of all users in the network
+            
+        Returns:
+            Set of reachable user IDs (excluding start_id)
+        """
+        visited = {start_id}
+        stack = [start_id]
+        
+        while stack:
+            current_user = users.get(stack.pop())
+            if current_user is None:
+                continue
+            
+            for referred_id in current_user.referrals:
+                if referred_id in visited:
+                    continue
+                visited.add(referred_id)
+                stack.append(referred_id)
+        
+        visited.discard(start_id)
+        return visited
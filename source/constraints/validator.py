@@ -18,7 +18,8 @@ class ReferralValidator:
     
     @staticmethod
     def can_add_referral(referrer_id: int, candidate_id: int, 
-                         users: Dict[int, User]) -> tuple[bool, str]:
+                         users: Dict[int, User],
+                         referrer_map: Optional[Dict[int, int]] = None) -> tuple[bool, str]:
         """
         Check if a referral can be added based on business rules.
         
@@ -26,6 +27,8 @@ class ReferralValidator:
             referrer_id: ID of the user making the referral
             candidate_id: ID of the user being referred
             users: Dictionary of all users in the network
+            referrer_map: Optional map of user ID to referrer ID; when given, the
+                referrer checks read it instead of calling into User objects
             
         Returns:
             Tuple of (is_valid, error_message)
@@ -41,33 +44,55 @@ class ReferralValidator:
             return False, "Users cannot refer themselves"
         
         # Unique referrer constraint
-        if users[candidate_id].has_referrer():
+        if referrer_map is not None:
+            has_referrer = candidate_id in referrer_map
+        else:
+            has_referrer = users[candidate_id].has_referrer()
+        if has_referrer:
             return False, f"User {candidate_id} already has a referrer"
         
         # Check for cycles
-        if ReferralValidator._would_create_cycle(referrer_id, candidate_id, users):
+        if ReferralValidator._would_create_cycle(referrer_id, candidate_id, users, referrer_map):
             return False, "Referral would create a cycle in the network"
         
         return True, ""
     
     @staticmethod
     def _would_create_cycle(referrer_id: int, candidate_id: int, 
-                           users: Dict[int, User]) -> bool:
+                           users: Dict[int, User],
+                           referrer_map: Optional[Dict[int, int]] = None) -> bool:
         """
         Check if adding a referral would create a cycle.
         
-        Uses DFS to detect cycles in the directed graph.
+        The new edge closes a cycle exactly when candidate_id can already reach
+        referrer_id. With a referrer_map, which the network keeps in step with
+        every referral it adds, each user has at most one referrer, so that
+        holds iff candidate_id is an ancestor of referrer_id; this is checked
+        by walking up the chain from referrer_id in O(depth). Without one,
+        User.referrer can't be trusted to match the referral sets, so a DFS
+        over the candidate's referrals is used instead.
         
         Args:
             referrer_id: ID of the user making the referral
             candidate_id: ID of the user being referred
             users: Dictionary of all users in the network
+            referrer_map: Optional map of user ID to referrer ID to walk up
+                instead of searching the candidate's referrals
             
         Returns:
             True if cycle would be created, False otherwise
         """
-        # If candidate would refer back to referrer, that's a cycle
-        if candidate_id == referrer_id:
+        if referrer_map is not None:
+            current: Optional[int] = referrer_id
+            
+            # An acyclic chain has at most len(users) links; the bound guards corrupt data
+            for _ in range(len(users) + 1):
+                if current == candidate_id:
+                    return True
+                current = referrer_map.get(current)
+                if current is None:
+                    return False
+            
             return True
         
         # Check if candidate can reach referrer through existing referrals
@@ -78,7 +103,7 @@ class ReferralValidator:
             current = stack.pop()
             if current in visited:
                 continue
-                
+            
             visited.add(current)
             
             # If we can reach the referrer, that's a cycle
@@ -87,7 +112,7 @@ class ReferralValidator:
             
             # Add all users that current user has referred
             if current in users:
-                for referred_user in users[current].get_referrals():
+                for referred_user in users[current].referrals:
                     if referred_user not in visited:
                         stack.append(referred_user)
         
@@ -108,13 +133,13 @@ class ReferralValidator:
         
         for user_id, user in users.items():
             # Check that referrer exists
-            if user.has_referrer():
-                referrer_id = user.get_referrer()
+            referrer_id = user.referrer
+            if referrer_id is not None:
                 if referrer_id not in users:
                     errors.append(f"User {user_id} has non-existent referrer {referrer_id}")
             
             # Check that referred users exist
-            for referred_id in user.get_referrals():
+            for referred_id in user.referrals:
                 if referred_id not in users:
                     errors.append(f"User {user_id} refers to non-existent user {referred_id}")
         
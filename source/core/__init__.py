@@ -6,11 +6,12 @@ the core referral network functionality as specified in the assignment.
 """
 
 from .referral_network import ReferralNetwork
-from .simulation import simulate, days_to_target, min_bonus_for_target
+from .simulation import simulate, simulate_total, days_to_target, min_bonus_for_target
 
 __all__ = [
     'ReferralNetwork',
     'simulate',
+    'simulate_total',
     'days_to_target', 
     'min_bonus_for_target'
 ]
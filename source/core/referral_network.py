@@ -13,15 +13,17 @@ Design Choices:
 API Design:
 - add_user() returns boolean for idempotent behavior
 - add_referral() returns boolean and raises ValueError for invalid users
-- Query methods return copies to prevent external modification
+- Query methods return copies or read-only views to prevent external modification
 - All methods validate user existence before processing
 """
 
 import logging
-from typing import Set, List, Tuple, Dict, Optional
+from array import array
+from typing import FrozenSet, List, Tuple, Dict, Optional, Callable
 from ..models.user import User
 from ..constraints.validator import ReferralValidator
 from ..algorithms.network_analysis import NetworkAnalyzer
+from ..algorithms.csr_graph import CSRGraph
 from ..algorithms.reach_expansion import ReachExpander
 
 # Configure logging
@@ -41,6 +43,11 @@ class ReferralNetwork:
         """Initialize an empty referral network."""
         self.users: Dict[int, User] = {}
         self.referrer_map: Dict[int, int] = {}  # Maps user_id to their referrer_id
+        self._reach: Optional[List[int]] = None  # Reach bitset per CSR index, rebuilt lazily after mutation
+        self._result_cache: Dict[Tuple, List] = {}  # Deterministic query results keyed by (query, k)
+        self._total_cache: Dict[int, int] = {}  # Total referral count by user_id
+        self._csr: Optional[CSRGraph] = None  # Contiguous adjacency, rebuilt lazily after mutation
+        self._stale = False  # Set by any of this network's users when changed directly
     
     def add_user(self, user_id: int) -> bool:
         """
@@ -61,7 +68,8 @@ class ReferralNetwork:
         if user_id in self.users:
             return False
         
-        self.users[user_id] = User(user_id)
+        self.users[user_id] = User(user_id, self._mark_stale)
+        self._invalidate_caches()
         return True
     
     def add_referral(self, referrer_id: int, candidate_id: int) -> bool:
@@ -86,7 +94,7 @@ class ReferralNetwork:
         
         # Check business rules
         is_valid, error_msg = ReferralValidator.can_add_referral(
-            referrer_id, candidate_id, self.users
+            referrer_id, candidate_id, self.users, self.referrer_map
         )
         
         if not is_valid:
@@ -101,10 +109,11 @@ class ReferralNetwork:
         
         # Update referrer map for O(1) lookups
         self.referrer_map[candidate_id] = referrer_id
+        self._invalidate_caches()
         
         return True
     
-    def get_direct_referrals(self, user_id: int) -> Set[int]:
+    def get_direct_referrals(self, user_id: int) -> FrozenSet[int]:
         """
         Get users directly referred by the specified user.
         
@@ -112,13 +121,13 @@ class ReferralNetwork:
             user_id: ID of the user to query
             
         Returns:
-            Set of user IDs directly referred by this user
+            Read-only set of user IDs directly referred by this user
         """
         if user_id not in self.users:
-            return set()
+            return frozenset()
         
-        user = self.users[user_id]
-        return user.get_referrals().copy()  # Return copy to prevent external modification
+        # Frozen, so callers can't modify the network through it and no copy is needed
+        return self.users[user_id].get_referrals()
     
     def get_total_referrals(self, user_id: int) -> int:
         """
@@ -133,7 +142,12 @@ class ReferralNetwork:
         if user_id not in self.users:
             return 0
         
-        return NetworkAnalyzer.get_total_referrals(user_id, self.users)
+        self._sync_caches()
+        total = self._total_cache.get(user_id)
+        if total is None:
+            total = NetworkAnalyzer.get_total_referrals(user_id, self.users, self._get_csr())
+            self._total_cache[user_id] = total
+        return total
     
     def get_top_referrers(self, k: int) -> List[Tuple[int, int]]:
         """
@@ -148,7 +162,10 @@ class ReferralNetwork:
         if k <= 0:
             return []
         
-        return NetworkAnalyzer.get_top_referrers(k, self.users)
+        return self._cached_result(
+            ('top_referrers', k),
+            lambda: NetworkAnalyzer.get_top_referrers(k, self.users, self._get_csr())
+        )
     
     def get_unique_reach_expansion(self, k: int) -> List[Tuple[int, int]]:
         """
@@ -158,12 +175,17 @@ class ReferralNetwork:
             k: Number of top referrers to return
             
         Returns:
-            List of tuples (user_id, unique_reach_count) sorted by unique reach
+            List of tuples (user_id, unique_reach_count) in greedy selection order,
+            each count being the new users that pick added
         """
         if k <= 0:
             return []
         
-        return ReachExpander.get_unique_reach_expansion(k, self.users)
+        return self._cached_result(
+            ('unique_reach', k),
+            lambda: ReachExpander.get_unique_reach_expansion(k, self.users, self._get_csr(),
+                                                          self._get_reach())
+        )
     
     def get_flow_centrality(self, k: int) -> List[Tuple[int, float]]:
         """
@@ -178,15 +200,22 @@ class ReferralNetwork:
         if k <= 0:
             return []
         
-        return NetworkAnalyzer.get_flow_centrality(k, self.users)
+        return self._cached_result(
+            ('flow_centrality', k),
+            lambda: NetworkAnalyzer.get_flow_centrality(k, self.users, self._get_csr())
+        )
     
-    def get_flow_centrality_optimized(self, k: int, sample_ratio: float = 0.3) -> List[Tuple[int, float]]:
+    def get_flow_centrality_optimized(self, k: int, sample_ratio: float = 0.3,
+                                      chunk_size: int = 64,
+                                      n_workers: Optional[int] = None) -> List[Tuple[int, float]]:
         """
         Get top k users based on flow centrality using optimized algorithm.
         
         Args:
             k: Number of top users to return
             sample_ratio: Ratio of user pairs to sample for optimization
+            chunk_size: Number of BFS sources handled per batch
+            n_workers: Number of worker processes (None or 1 runs in-process)
             
         Returns:
             List of tuples (user_id, centrality_score) sorted by centrality
@@ -194,7 +223,30 @@ class ReferralNetwork:
         if k <= 0:
             return []
         
-        return NetworkAnalyzer.get_flow_centrality_optimized(k, self.users, sample_ratio)
+        return NetworkAnalyzer.get_flow_centrality_optimized(
+            k, self.users, sample_ratio, self._get_csr(), chunk_size, n_workers
+        )
+    
+    def get_flow_centrality_adaptive(self, k: int, epsilon: float = 0.05, delta: float = 0.1,
+                                     seed: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Get top k users based on flow centrality using adaptive path sampling.
+        
+        Args:
+            k: Number of top users to return
+            epsilon: Maximum additive error on normalized centrality
+            delta: Probability that the error bound may be exceeded
+            seed: Seed for the random number generator, for reproducible results
+            
+        Returns:
+            List of tuples (user_id, centrality_score) sorted by centrality
+        """
+        if k <= 0:
+            return []
+        
+        return NetworkAnalyzer.get_flow_centrality_adaptive(
+            k, self.users, epsilon, delta, self._get_csr(), seed
+        )
     
     def get_network_size(self) -> int:
         """
@@ -209,6 +261,11 @@ class ReferralNetwork:
         """
         Get a user by ID.
         
+        Changes made through the returned user's methods are seen by later
+        queries. Replacing entries of self.users, or editing a user's
+        referrals set in place, bypasses cache invalidation; use the
+        network's methods for those changes.
+        
         Args:
             user_id: ID of the user to retrieve
             
@@ -251,8 +308,9 @@ class ReferralNetwork:
         errors = []
         
         # Check for cycles
-        for user_id in self.users:
-            if self._has_cycle(user_id):
+        reaches_cycle = self._find_users_reaching_cycles()
+        for user_id, flagged in zip(self.users, reaches_cycle):
+            if flagged:
                 errors.append(f"Cycle detected involving user {user_id}")
         
         # Check for orphaned users (users with referrers that don't exist)
@@ -266,56 +324,82 @@ class ReferralNetwork:
         """Clear all users and referrals from the network."""
         self.users.clear()
         self.referrer_map.clear()
+        self._invalidate_caches()
     
     def __repr__(self) -> str:
         """String representation of the network."""
         return f"ReferralNetwork(users={len(self.users)}, referrals={len(self.referrer_map)})"
     
-    def export_network(self) -> Dict:
+    def export_network(self, compact: bool = False) -> Dict:
         """
         Export the network data for serialization.
         
+        The default layout has one nested dict per user. The compact layout
+        is the network's CSR adjacency: 'ids' lists every user ID, and the
+        referrals of ids[i] are ids[j] for each j in
+        referrals[offsets[i]:offsets[i + 1]]. It is built from the cached
+        CSR arrays with no per-user objects, and import_network accepts both.
+        
+        Args:
+            compact: Export flat arrays instead of per-user dictionaries
+            
         Returns:
             Dictionary containing network data
         """
-        network_data = {
-            'users': {},
-            'referrals': {}
-        }
-        
-        # Export user data
-        for user_id, user in self.users.items():
-            network_data['users'][user_id] = {
-                'referrals': list(user.get_referrals()),
-                'referrer': user.get_referrer()
+        if compact:
+            graph = self._get_csr()
+            return {
+                'ids': array('q', graph.idx_to_id),
+                'offsets': array('i', graph.indptr),
+                'referrals': array('i', graph.indices)
             }
         
-        return network_data
+        return {
+            'users': {
+                user_id: {'referrals': list(user.referrals), 'referrer': user.referrer}
+                for user_id, user in self.users.items()
+            },
+            'referrals': {}
+        }
     
-    def import_network(self, network_data: Dict) -> bool:
+    def import_network(self, network_data: Dict, trusted: bool = False) -> bool:
         """
         Import network data from a dictionary.
         
+        Untrusted data goes through add_referral, so every edge is checked
+        against the business rules and invalid ones are skipped. Trusted data
+        (e.g. a previous export_network result) is loaded without per-edge
+        checks and validated with a single whole-network pass at the end; if
+        that pass finds a violation the network is cleared and the import fails.
+        
         Args:
-            network_data: Dictionary containing network data
+            network_data: Dictionary containing network data, in either
+                export_network layout
+            trusted: Skip per-edge validation for data known to be consistent
             
         Returns:
             True if import was successful, False otherwise
         """
         try:
             self.clear()
+            user_ids, referral_lists = ReferralNetwork._decode_network_data(network_data)
             
             # Import users first
-            for user_id in network_data.get('users', {}):
-                self.add_user(int(user_id))
+            for user_id in user_ids:
+                self.add_user(user_id)
+            
+            if trusted:
+                self._load_referrals_unchecked(referral_lists)
+                errors = self.validate_network()
+                if errors:
+                    self.clear()
+                    raise ValueError(errors[0])
+                return True
             
             # Import referrals
-            for user_id, user_data in network_data.get('users', {}).items():
-                user_id = int(user_id)
-                
-                # Add referrals
-                for referral_id in user_data.get('referrals', []):
-                    self.add_referral(user_id, int(referral_id))
+            for user_id, referral_ids in referral_lists:
+                for referral_id in referral_ids:
+                    self.add_referral(user_id, referral_id)
             
             return True
             
@@ -323,36 +407,167 @@ class ReferralNetwork:
             logger.error(f"Failed to import network: {e}")
             return False
     
-    def _has_cycle(self, start_user_id: int) -> bool:
+    @staticmethod
+    def _decode_network_data(network_data: Dict) -> Tuple[List[int], List[Tuple[int, List[int]]]]:
         """
-        Check if there's a cycle starting from the given user.
+        Read user IDs and referral lists from either export layout.
         
         Args:
-            start_user_id: ID of the user to start cycle detection from
+            network_data: Dictionary containing network data
             
         Returns:
-            True if a cycle is detected, False otherwise
+            Tuple of (user_ids, [(referrer_id, referral_ids), ...])
+        """
+        if 'ids' in network_data:
+            ids = [int(user_id) for user_id in network_data['ids']]
+            offsets = network_data['offsets']
+            referrals = network_data['referrals']
+            referral_lists = [
+                (user_id, [ids[j] for j in referrals[offsets[i]:offsets[i + 1]]])
+                for i, user_id in enumerate(ids)
+            ]
+            return ids, referral_lists
+        
+        users = network_data.get('users', {})
+        referral_lists = [
+            (int(user_id), [int(referral_id) for referral_id in user_data.get('referrals', [])])
+            for user_id, user_data in users.items()
+        ]
+        return [int(user_id) for user_id in users], referral_lists
+    
+    def _load_referrals_unchecked(self, referral_lists: List[Tuple[int, List[int]]]) -> None:
         """
-        visited = set()
-        rec_stack = set()
+        Write imported referrals straight into the network, skipping rule checks.
         
-        def dfs(user_id: int) -> bool:
-            if user_id in rec_stack:
-                return True  # Cycle detected
-            
-            if user_id in visited:
-                return False
+        Only the unique referrer constraint is enforced here, since a second
+        referrer would silently overwrite referrer_map; cycles are left for the
+        caller's validation pass.
+        
+        Args:
+            referral_lists: Pairs of (referrer_id, referral_ids) to load
             
-            visited.add(user_id)
-            rec_stack.add(user_id)
+        Raises:
+            ValueError: If a referral names an unknown user or a second referrer
+        """
+        for referrer_id, referral_ids in referral_lists:
+            if referrer_id not in self.users:
+                raise ValueError(f"Referrer {referrer_id} does not exist")
+            referrer = self.users[referrer_id]
             
-            user = self.users.get(user_id)
-            if user:
-                for referral_id in user.get_referrals():
-                    if dfs(referral_id):
-                        return True
+            for candidate_id in referral_ids:
+                if candidate_id not in self.users:
+                    raise ValueError(f"Candidate {candidate_id} does not exist")
+                if self.referrer_map.get(candidate_id, referrer_id) != referrer_id:
+                    raise ValueError(f"User {candidate_id} already has a referrer")
+                
+                referrer.add_referral(candidate_id)
+                self.users[candidate_id].set_referrer(referrer_id)
+                self.referrer_map[candidate_id] = referrer_id
+        
+        self._invalidate_caches()
+    
+    def _cached_result(self, key: Tuple, compute: Callable[[], List]) -> List:
+        """
+        Get a memoized query result, computing it on first use.
+        
+        Only deterministic queries are cached; sampled estimates are not.
+        
+        Args:
+            key: Query name and arguments identifying the result
+            compute: Function producing the result on a cache miss
             
-            rec_stack.remove(user_id)
-            return False
+        Returns:
+            Copy of the cached result list
+        """
+        self._sync_caches()
+        result = self._result_cache.get(key)
+        if result is None:
+            result = compute()
+            self._result_cache[key] = result
+        return list(result)
+    
+    def _get_csr(self) -> CSRGraph:
+        """
+        Get the CSR adjacency of the network, building it if stale.
         
-        return dfs(start_user_id)
+        Returns:
+            CSRGraph reflecting the current users and referrals
+        """
+        self._sync_caches()
+        if self._csr is None:
+            self._csr = CSRGraph.from_users(self.users)
+        return self._csr
+    
+    def _get_reach(self) -> List[int]:
+        """
+        Get the reach bitset of every user, computing them if stale.
+        
+        Returns:
+            Reach bitset for each index of the CSR adjacency
+        """
+        self._sync_caches()
+        if self._reach is None:
+            self._reach = NetworkAnalyzer.get_reach_bitsets(self._get_csr())
+        return self._reach
+    
+    def _invalidate_caches(self) -> None:
+        """Drop memoized traversal results after the network changes."""
+        self._reach = None
+        self._result_cache.clear()
+        self._total_cache.clear()
+        self._csr = None
+        self._stale = False
+    
+    def _mark_stale(self) -> None:
+        """Flag the caches as outdated; called by this network's users when they change."""
+        self._stale = True
+    
+    def _sync_caches(self) -> None:
+        """Drop memoized results if any user was modified directly since they were built."""
+        if self._stale:
+            self._invalidate_caches()
+    
+    def _find_users_reaching_cycles(self) -> List[bool]:
+        """
+        Find every user from which a referral cycle can be reached.
+        
+        Runs one iterative three-color DFS over the whole network. Every cycle
+        contains a back edge (an edge into a gray user), so a user reaches a
+        cycle exactly when it has a back edge or a referral that reaches one;
+        that flag is folded into each user when it turns black.
+        
+        Returns:
+            Flag for each user, in the order of self.users
+        """
+        white, gray, black = 0, 1, 2
+        id_to_idx = {user_id: idx for idx, user_id in enumerate(self.users)}
+        children = [[id_to_idx[referral_id] for referral_id in user.referrals
+                     if referral_id in id_to_idx]
+                    for user in self.users.values()]
+        color = bytearray(len(children))
+        reaches_cycle = [False] * len(children)
+        
+        for root in range(len(children)):
+            if color[root] != white:
+                continue
+            
+            color[root] = gray
+            stack = [(root, iter(children[root]))]
+            while stack:
+                node, pending = stack[-1]
+                child = next(pending, None)
+                if child is None:
+                    color[node] = black
+                    stack.pop()
+                    if stack and reaches_cycle[node]:
+                        reaches_cycle[stack[-1][0]] = True
+                elif color[child] == gray:
+                    reaches_cycle[node] = True
+                elif color[child] == black:
+                    if reaches_cycle[child]:
+                        reaches_cycle[node] = True
+                else:
+                    color[child] = gray
+                    stack.append((child, iter(children[child])))
+        
+        return reaches_cycle
@@ -5,7 +5,10 @@ This module implements the network growth simulation (Part 4) and referral bonus
 optimization (Part 5) for the Mercor Challenge.
 """
 
-from typing import List, Callable, Optional
+from functools import lru_cache, reduce
+from itertools import repeat
+from operator import add
+from typing import List, Dict, Callable, Optional
 import math
 
 
@@ -36,59 +39,85 @@ class SimulationConfig:
 DEFAULT_CONFIG = SimulationConfig()
 
 
-def simulate(p: float, days: int) -> List[float]:
+def _active_days(p: float, days: int, referral_capacity: int) -> int:
+    """
+    Get the number of days on which the referrers are still making referrals.
+    
+    Every referrer starts with the same capacity and spends the same p per
+    day, so all are active together and exhaust on the same day: after
+    ceil(capacity / p) days. Solving for that day directly also avoids the
+    float drift of subtracting p repeatedly (e.g. p = 0.1 leaving a tiny
+    positive residue after 100 days and granting an extra day). When the
+    capacity outlasts the simulation the division is skipped, since for a
+    tiny p (e.g. a subnormal) capacity / p overflows to infinity.
+    
+    Args:
+        p: Daily referral probability of each active referrer
+        days: Number of days simulated (must be positive)
+        referral_capacity: Maximum referrals per referrer
+        
+    Returns:
+        Number of leading days that add referrals, at most days
+    """
+    if p <= 0 or p * days < referral_capacity:
+        return days
+    return min(days, math.ceil(referral_capacity / p))
+
+
+def simulate(p: float, days: int, config: SimulationConfig = DEFAULT_CONFIG) -> List[float]:
     """
     Simulate network growth over time and return cumulative expected referrals.
     
     Model Parameters:
-    - Initial referrers: 100 active referrers
+    - Initial referrers: 100 active referrers (config.initial_referrers)
     - Referral capacity: Each referrer can make up to 10 successful referrals
+      (config.referral_capacity)
     - Time unit: Discrete steps called days
     
     Args:
         p: Probability that an active user will successfully refer someone on any given day
         days: Number of days to simulate
+        config: Referrer count and capacity of the model (default: DEFAULT_CONFIG)
         
     Returns:
         List where element at index i is the cumulative total expected referrals at end of day i
     """
-    INITIAL_REFERRERS = 100
-    REFERRAL_CAPACITY = 10
+    if days <= 0:
+        return []
     
-    # Track active referrers and their remaining capacity
-    active_referrers = INITIAL_REFERRERS
-    referrer_capacities = [REFERRAL_CAPACITY] * INITIAL_REFERRERS
+    active_days = _active_days(p, days, config.referral_capacity)
     
-    cumulative_referrals = []
-    total_referrals = 0.0
-    
-    for day in range(days):
-        daily_referrals = 0.0
-        
-        # Each active referrer has probability p of making a successful referral
-        for i in range(active_referrers):
-            if referrer_capacities[i] > 0:
-                # Expected value: p referrals per day
-                daily_referrals += p
-                referrer_capacities[i] -= p
-                
-                # If capacity is exhausted, mark as inactive
-                if referrer_capacities[i] <= 0:
-                    active_referrers -= 1
-        
-        total_referrals += daily_referrals
-        cumulative_referrals.append(total_referrals)
-        
-        # Early termination if no active referrers remain
-        if active_referrers <= 0:
-            # Pad remaining days with the same total
-            while len(cumulative_referrals) < days:
-                cumulative_referrals.append(total_referrals)
-            break
+    # Expected value: p referrals per active referrer per day. Each day's total
+    # is the same closed-form product simulate_total() uses, rather than a
+    # running sum, so the last element matches it exactly
+    daily_referrals = float(config.initial_referrers * p)
+    cumulative_referrals = list(map(daily_referrals.__mul__, range(1, active_days + 1)))
     
+    # Pad remaining days with the same total
+    cumulative_referrals.extend(repeat(cumulative_referrals[-1], days - active_days))
     return cumulative_referrals
 
 
+def simulate_total(p: float, days: int, config: SimulationConfig = DEFAULT_CONFIG) -> float:
+    """
+    Get the cumulative expected referrals at the end of the last day.
+    
+    Equivalent to simulate(p, days, config)[-1] (0.0 for non-positive days)
+    but evaluated in closed form, without building the per-day series.
+    
+    Args:
+        p: Probability that an active user will successfully refer someone on any given day
+        days: Number of days to simulate
+        config: Referrer count and capacity of the model (default: DEFAULT_CONFIG)
+        
+    Returns:
+        Cumulative total expected referrals after the given number of days
+    """
+    if days <= 0:
+        return 0.0
+    return float(config.initial_referrers * p) * _active_days(p, days, config.referral_capacity)
+
+
 def simulate_network_growth(
     initial_users: int,
     target_users: int,
@@ -126,22 +155,49 @@ def simulate_network_growth(
             'final_users': initial_users
         }
     
-    # Each user has a referral capacity (like in the original simulate function)
-    REFERRAL_CAPACITY = 10
+    return _grow_network(initial_users, target_users, adoption_prob, max_days,
+                         DEFAULT_CONFIG.referral_capacity)
+
+
+def _grow_network(
+    initial_users: int,
+    target_users: int,
+    adoption_prob: Callable[[int], float],
+    max_days: int,
+    referral_capacity: int
+) -> dict:
+    """
+    Run the growth simulation on arguments that are already validated.
     
+    Args:
+        initial_users: Starting number of users (positive, below target_users)
+        target_users: Target number of users to reach
+        adoption_prob: Function that returns adoption probability for current user count
+        max_days: Maximum number of days to simulate (positive)
+        referral_capacity: Maximum referrals per user (like in the simulate function)
+        
+    Returns:
+        Result dictionary as described in simulate_network_growth
+    """
     current_users = initial_users
     days_taken = 0
     
-    # Track remaining referral capacity for each user
-    user_capacities = [REFERRAL_CAPACITY] * initial_users
+    # Only the initial users refer, and they all start at the same capacity
+    # and spend the same prob each day, so one shared remaining capacity
+    # stands in for the whole cohort
+    remaining_capacity = referral_capacity
+    
+    # The user count repeats whenever a day rounds to no new users, so each
+    # distinct count only needs one adoption_prob evaluation
+    cached_prob = lru_cache(maxsize=None)(adoption_prob)
+    
+    # Day totals by prob; active_users is always initial_users, so a repeated
+    # prob repeats the whole sum
+    daily_totals: Dict[float, float] = {}
     
     for day in range(max_days):
         # Get adoption probability for current user count
-        try:
-            prob = adoption_prob(current_users)
-        except:
-            # If adoption_prob function fails, use a default
-            prob = 0.1
+        prob = cached_prob(current_users)
         
         # Validate probability
         if prob < 0 or prob > 1:
@@ -151,20 +207,25 @@ def simulate_network_growth(
         new_users = 0
         active_users = 0
         
-        for i in range(len(user_capacities)):
-            if user_capacities[i] > 0:
-                active_users += 1
-                # Each active user has probability prob of making a successful referral
-                if prob > 0:
-                    # Expected value: prob referrals per day
-                    daily_referrals = prob
-                    user_capacities[i] -= daily_referrals
-                    
-                    # If capacity is exhausted, mark as inactive
-                    if user_capacities[i] <= 0:
-                        user_capacities[i] = 0
-                    
-                    new_users += daily_referrals
+        if remaining_capacity > 0:
+            active_users = initial_users
+            # Each active user has probability prob of making a successful referral
+            if prob > 0:
+                # Expected value: prob referrals per day
+                remaining_capacity -= prob
+                
+                # If capacity is exhausted, mark as inactive
+                if remaining_capacity <= 0:
+                    remaining_capacity = 0
+                
+                # Sum prob once per active user, in order, rather than taking
+                # active_users * prob: the rounding below sees the difference
+                # (50 users at 0.01 sum to just over 0.5 and round up, while
+                # the product is exactly 0.5 and rounds to 0)
+                new_users = daily_totals.get(prob)
+                if new_users is None:
+                    new_users = reduce(add, repeat(prob, active_users), 0)
+                    daily_totals[prob] = new_users
         
         # Round to nearest integer for realistic simulation
         new_users = round(new_users)
@@ -183,6 +244,12 @@ def simulate_network_growth(
         # Early termination if no active users remain
         if active_users == 0:
             break
+        
+        # With no referrals made, neither the user count nor the capacity
+        # changes, so every remaining day would repeat this one
+        if new_users == 0 and prob == 0:
+            days_taken = max_days
+            break
     
     # Target not reached within max_days or capacity exhausted
     return {
@@ -220,7 +287,8 @@ def days_to_target(
     # Use simulation to find the answer
     # Start with a reasonable upper bound
     max_days = 1000
-    result = simulate_network_growth(initial_users, target_users, adoption_prob, max_days)
+    result = _grow_network(initial_users, target_users, adoption_prob, max_days,
+                           DEFAULT_CONFIG.referral_capacity)
     
     if result['success']:
         return result['days_taken']
@@ -232,88 +300,60 @@ def min_bonus_for_target(
     days: int, 
     target_hires: int, 
     adoption_prob: Callable[[int], float], 
-    eps: float = 1e-3
+    eps: float = 1e-3,
+    config: SimulationConfig = DEFAULT_CONFIG
 ) -> Optional[float]:
     """
     Find the minimum bonus amount required to achieve a hiring target.
     
     This function efficiently searches for the minimum bonus using binary search,
-    leveraging the monotonic nature of the adoption probability function.
+    leveraging the monotonic nature of the adoption probability function. Each
+    probe is checked against simulate_total, the closed-form final value of
+    simulate, so the accepted bonus is exactly one the simulation agrees with.
     
     Args:
         days: Number of days available for hiring
         target_hires: Target number of hires to achieve
         adoption_prob: Function that returns adoption probability for a given bonus amount
-        eps: Precision for probability comparison (default: 1e-3)
+        eps: Unused; kept for API compatibility, since the search is exact on
+            the bonus grid
+        config: Referrer model, bonus search range and rounding increment
+            (default: DEFAULT_CONFIG)
         
     Returns:
-        Minimum bonus amount (rounded UP to nearest $10) required to achieve target,
-        or None if target is unachievable with any finite bonus
+        Minimum bonus amount (rounded UP to the nearest bonus increment, $10 by
+        default) required to achieve target, or None if target is unachievable
+        with any finite bonus
         
-    Time Complexity: O(log B * D) where:
-    - B is the range of bonus values to search (typically 1000)
-    - D is the number of days (for simulation)
-    
-    The binary search over bonus space takes O(log B) iterations, and each iteration
-    requires running the simulation which takes O(D) time. Therefore, the total time
-    complexity is O(log B * D).
+    Time Complexity: O(log B) where B is the number of bonus steps to search
+    (typically 100: $10 to $1000 in $10 increments). Each iteration is one
+    adoption_prob call and one O(1) simulate_total evaluation.
     """
     # Handle edge cases
     if days <= 0 or target_hires <= 0:
         return None
     
-    # Binary search over bonus amounts
-    # Start with reasonable bounds: $0 to $1000
-    left_bonus = 0
-    right_bonus = 1000
+    # Binary search over the bonus grid, in units of config.bonus_increment,
+    # so the answer needs no rounding afterwards. A bonus of 0 gives 0
+    # probability, so the search starts at one increment
+    increment = config.bonus_increment
+    left_step = 1
+    right_step = config.max_bonus // increment
     
-    # Check if target is achievable with maximum bonus
-    max_prob = adoption_prob(right_bonus)
-    if max_prob > 0:
-        max_simulation = simulate(max_prob, days)
-        if max_simulation[-1] < target_hires:
-            return None  # Target unachievable
+    # Check if target is achievable with maximum bonus; from here on
+    # right_step always holds a bonus known to reach the target
+    if simulate_total(adoption_prob(right_step * increment), days, config) < target_hires:
+        return None  # Target unachievable
     
     # Binary search for minimum bonus
-    while left_bonus < right_bonus:
-        mid_bonus = (left_bonus + right_bonus) // 2
-        
-        # Get adoption probability for this bonus
-        prob = adoption_prob(mid_bonus)
+    while left_step < right_step:
+        mid_step = (left_step + right_step) // 2
         
-        # Simulate with this probability
-        simulation_result = simulate(prob, days)
-        total_referrals = simulation_result[-1]
-        
-        if total_referrals >= target_hires:
+        if simulate_total(adoption_prob(mid_step * increment), days, config) >= target_hires:
             # This bonus works, try to find a smaller one
-            right_bonus = mid_bonus
+            right_step = mid_step
         else:
             # This bonus is too low
-            left_bonus = mid_bonus + 1
-    
-    # Find the exact minimum bonus that works
-    # Start from left_bonus and check each $10 increment
-    for bonus in range(left_bonus, left_bonus + 20, 10):
-        prob = adoption_prob(bonus)
-        simulation_result = simulate(prob, days)
-        if simulation_result[-1] >= target_hires:
-            min_bonus = bonus
-            break
-    else:
-        # If no bonus found in range, use the calculated value
-        min_bonus = math.ceil(left_bonus / 10) * 10
-    
-    # Ensure we never return 0 as a valid bonus (since it gives 0 probability)
-    if min_bonus == 0:
-        min_bonus = 10
+            left_step = mid_step + 1
     
-    # Verify the result
-    final_prob = adoption_prob(min_bonus)
-    final_simulation = simulate(final_prob, days)
-    
-    if final_simulation[-1] >= target_hires:
-        return float(min_bonus)
-    else:
-        # This shouldn't happen with proper binary search, but safety check
-        return None
+    return float(right_step * increment)
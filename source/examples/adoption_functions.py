@@ -5,9 +5,13 @@ This module provides example functions that model how referral bonuses
 affect the probability of successful referrals.
 """
 
+import math
 from typing import Callable
 
 
+_exp = math.exp
+
+
 def example_adoption_prob(bonus: int) -> float:
     """
     Example adoption probability function.
@@ -28,12 +32,11 @@ def example_adoption_prob(bonus: int) -> float:
     
     # Base probability increases with bonus, but with diminishing returns
     # Formula: 0.1 + 0.9 * (1 - e^(-bonus/100))
-    import math
     base_prob = 0.1
     max_increase = 0.9
     sensitivity = 100.0
     
-    probability = base_prob + max_increase * (1 - math.exp(-bonus / sensitivity))
+    probability = base_prob + max_increase * (1 - _exp(-bonus / sensitivity))
     
     # Ensure probability is between 0 and 1
     return max(0.0, min(1.0, probability))
@@ -50,13 +53,13 @@ def create_test_adoption_prob(base_prob: float = 0.5, sensitivity: float = 100.0
     Returns:
         A callable function that takes bonus and returns probability
     """
+    max_increase = 1.0 - base_prob
+    
     def adoption_prob(bonus: int) -> float:
         if bonus <= 0:
             return base_prob
         
-        import math
-        max_increase = 1.0 - base_prob
-        probability = base_prob + max_increase * (1 - math.exp(-bonus / sensitivity))
+        probability = base_prob + max_increase * (1 - _exp(-bonus / sensitivity))
         return max(0.0, min(1.0, probability))
     
     return adoption_prob
@@ -4,7 +4,7 @@ User model for the referral network system.
 This module defines the User class and related user management functionality.
 """
 
-from typing import Set, Optional
+from typing import Set, FrozenSet, Optional, Callable
 
 
 class User:
@@ -14,16 +14,22 @@ class User:
     Each user has a unique ID and can be part of referral relationships.
     """
     
-    def __init__(self, user_id: int):
+    __slots__ = ('user_id', 'referrals', 'referrer', '_referrals_frozen', '_on_change')
+    
+    def __init__(self, user_id: int, on_change: Optional[Callable[[], None]] = None):
         """
         Initialize a new user.
         
         Args:
             user_id: Unique identifier for the user
+            on_change: Called after every change to this user, so the network
+                holding it can drop caches derived from it
         """
         self.user_id = user_id
         self.referrals: Set[int] = set()  # Users this user has referred
         self.referrer: Optional[int] = None  # User who referred this user
+        self._referrals_frozen: Optional[FrozenSet[int]] = None  # Read-only snapshot, reset on change
+        self._on_change = on_change
     
     def add_referral(self, candidate_id: int) -> bool:
         """
@@ -37,6 +43,9 @@ class User:
         """
         if candidate_id not in self.referrals:
             self.referrals.add(candidate_id)
+            self._referrals_frozen = None
+            if self._on_change is not None:
+                self._on_change()
             return True
         return False
     
@@ -48,6 +57,8 @@ class User:
             referrer_id: ID of the referring user
         """
         self.referrer = referrer_id
+        if self._on_change is not None:
+            self._on_change()
     
     def has_referrer(self) -> bool:
         """
@@ -67,14 +78,20 @@ class User:
         """
         return self.referrer
     
-    def get_referrals(self) -> Set[int]:
+    def get_referrals(self) -> FrozenSet[int]:
         """
         Get all users this user has referred.
         
+        The result is a read-only snapshot, so callers can't mutate the user's
+        referrals through it. It is built once and reused until add_referral
+        changes the referrals, so repeated queries don't copy the set.
+        
         Returns:
-            Set of user IDs that this user has referred
+            Frozen set of user IDs that this user has referred
         """
-        return self.referrals.copy()
+        if self._referrals_frozen is None:
+            self._referrals_frozen = frozenset(self.referrals)
+        return self._referrals_frozen
     
     def __repr__(self) -> str:
         """String representation of the user."""
@@ -95,6 +95,28 @@ class TestPart1CoreStructure(unittest.TestCase):
         # Test single user network
         self.assertEqual(len(self.network.get_direct_referrals(1)), 0)
         self.assertEqual(self.network.get_total_referrals(1), 0)
+    
+    def test_trusted_import_round_trip(self):
+        """Test exporting a network and importing it back without per-edge checks."""
+        for i in range(1, 5):
+            self.network.add_user(i)
+        self.network.add_referral(1, 2)
+        self.network.add_referral(1, 3)
+        self.network.add_referral(3, 4)
+        
+        restored = ReferralNetwork()
+        self.assertTrue(restored.import_network(self.network.export_network(), trusted=True))
+        self.assertEqual(restored.referrer_map, self.network.referrer_map)
+        self.assertEqual(restored.get_total_referrals(1), 3)
+        
+        compact = ReferralNetwork()
+        self.assertTrue(compact.import_network(self.network.export_network(compact=True)))
+        self.assertEqual(compact.referrer_map, self.network.referrer_map)
+        
+        # A cycle in trusted data is caught by the final validation pass
+        cyclic = {'users': {1: {'referrals': [2]}, 2: {'referrals': [1]}}}
+        self.assertFalse(restored.import_network(cyclic, trusted=True))
+        self.assertEqual(restored.get_network_size(), 0)
 
 
 if __name__ == '__main__':
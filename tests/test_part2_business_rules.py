@@ -83,6 +83,12 @@ class TestPart2BusinessRules(unittest.TestCase):
         # Verify cycle wasn't created
         self.assertNotIn(1, self.network.get_direct_referrals(3))
         self.assertNotIn(2, self.network.get_direct_referrals(4))
+        
+        # Without a referrer map, cycles are found from the referral sets alone
+        self.users[1].add_referral(2)
+        is_valid, error_msg = ReferralValidator.can_add_referral(2, 1, self.users)
+        self.assertFalse(is_valid)
+        self.assertIn("cycle", error_msg)
     
     def test_referral_validation(self):
         """Test referral validation and error handling."""
@@ -9,6 +9,8 @@ This test suite validates the influencer identification functionality including:
 """
 
 import unittest
+from unittest import mock
+from source.algorithms.network_analysis import NetworkAnalyzer
 from source.core.referral_network import ReferralNetwork
 
 
@@ -35,6 +37,12 @@ class TestPart3InfluencerIdentification(unittest.TestCase):
         self.assertEqual(self.network.get_total_referrals(3), 0)
         self.assertEqual(self.network.get_total_referrals(4), 0)
         
+        # Test totals reflect referrals added after a query
+        self.network.add_user(5)
+        self.network.add_referral(4, 5)
+        self.assertEqual(self.network.get_total_referrals(1), 4)
+        self.assertEqual(self.network.get_total_referrals(4), 1)
+        
         # Test empty network
         empty_network = ReferralNetwork()
         self.assertEqual(empty_network.get_total_referrals(1), 0)
@@ -62,11 +70,46 @@ class TestPart3InfluencerIdentification(unittest.TestCase):
         top_refs = self.network.get_top_referrers(2)
         self.assertEqual(len(top_refs), 2)
         
+        # Cached results must reflect later referrals
+        self.network.add_user(6)
+        self.network.add_user(7)
+        self.network.add_user(8)
+        self.network.add_referral(5, 6)
+        self.network.add_referral(6, 7)
+        top_refs = self.network.get_top_referrers(2)
+        self.assertEqual(top_refs[0], (1, 6))
+        self.assertEqual(top_refs[1], (3, 3))
+        
+        # ...including ones made directly on a User returned by the network
+        self.assertEqual(self.network.get_total_referrals(1), 6)
+        self.network.get_user(7).add_referral(8)
+        self.assertEqual(self.network.get_total_referrals(1), 7)
+        self.assertEqual(self.network.get_top_referrers(1), [(1, 7)])
+        
         # Test empty network
         empty_network = ReferralNetwork()
         top_refs = empty_network.get_top_referrers(3)
         self.assertEqual(len(top_refs), 0)
     
+    def test_top_referrers_with_shared_referrals(self):
+        """Test top referrer totals on users edited directly into a diamond or cycle."""
+        for i in range(4):
+            self.network.add_user(i)
+        
+        # Diamond: 0 -> 1 -> 3 and 0 -> 2 -> 3, so user 3 has two referrers
+        self.network.add_referral(0, 1)
+        self.network.add_referral(0, 2)
+        self.network.add_referral(1, 3)
+        self.network.get_user(2).add_referral(3)
+        for user_id, total in self.network.get_top_referrers(4):
+            self.assertEqual(total, self.network.get_total_referrals(user_id))
+        self.assertEqual(self.network.get_top_referrers(1), [(0, 3)])
+        
+        # Cycle reachable from a root: 0 -> 1 -> 3 -> 1
+        self.network.get_user(3).add_referral(1)
+        for user_id, total in self.network.get_top_referrers(4):
+            self.assertEqual(total, self.network.get_total_referrals(user_id))
+    
     def test_unique_reach_expansion(self):
         """Test unique reach expansion algorithm."""
         # Build network with overlapping reach
@@ -91,6 +134,9 @@ class TestPart3InfluencerIdentification(unittest.TestCase):
         self.assertEqual(unique_reach[0][0], 1)
         self.assertEqual(unique_reach[0][1], 5)
         
+        # Everyone else's reach is already covered by user 1
+        self.assertEqual(unique_reach[1], (2, 0))
+        
         # Test no overlap scenario
         self.network.add_user(7)
         self.network.add_user(8)
@@ -129,6 +175,78 @@ class TestPart3InfluencerIdentification(unittest.TestCase):
         self.assertEqual(len(centrality), 3)
         self.assertEqual(centrality[0][0], 2)  # Middle user has highest centrality
     
+    def test_flow_centrality_scores(self):
+        """Test exact flow centrality scores on a referral chain."""
+        # Build chain: 1 -> 2 -> 3 -> 4 -> 5
+        for i in range(1, 6):
+            self.network.add_user(i)
+        for i in range(1, 5):
+            self.network.add_referral(i, i + 1)
+        
+        scores = dict(self.network.get_flow_centrality(5))
+        self.assertEqual(scores[1], 0.0)
+        self.assertEqual(scores[2], 3.0)  # (1,3), (1,4), (1,5)
+        self.assertEqual(scores[3], 4.0)  # (1,4), (1,5), (2,4), (2,5)
+        self.assertEqual(scores[4], 3.0)  # (1,5), (2,5), (3,5)
+        self.assertEqual(scores[5], 0.0)
+    
+    def test_cached_centrality_is_per_network(self):
+        """Test that changing one network's users leaves another network's cache intact."""
+        other_network = ReferralNetwork()
+        for network in (self.network, other_network):
+            for i in range(1, 5):
+                network.add_user(i)
+            for i in range(1, 4):
+                network.add_referral(i, i + 1)
+        
+        with mock.patch.object(NetworkAnalyzer, 'get_flow_centrality',
+                               wraps=NetworkAnalyzer.get_flow_centrality) as compute:
+            expected = other_network.get_flow_centrality(4)
+            self.network.get_user(4).add_referral(1)
+            self.assertEqual(other_network.get_flow_centrality(4), expected)
+            self.assertEqual(compute.call_count, 1)
+            
+            # The changed network itself recomputes
+            self.network.get_flow_centrality(4)
+            self.assertEqual(compute.call_count, 2)
+    
+    def test_flow_centrality_adaptive(self):
+        """Test adaptive sampling stays within its error bound on a chain."""
+        for i in range(1, 61):
+            self.network.add_user(i)
+        for i in range(1, 60):
+            self.network.add_referral(i, i + 1)
+        
+        exact = dict(self.network.get_flow_centrality(60))
+        adaptive = self.network.get_flow_centrality_adaptive(60, seed=7)
+        self.assertEqual(len(adaptive), 60)
+        for user_id, score in adaptive:
+            self.assertLessEqual(abs(score - exact[user_id]) / (60 * 59), 0.05)
+        
+        # Small networks need more samples than there are pairs, so they are exact
+        small_network = ReferralNetwork()
+        for i in range(1, 6):
+            small_network.add_user(i)
+        for i in range(1, 5):
+            small_network.add_referral(i, i + 1)
+        self.assertEqual(small_network.get_flow_centrality_adaptive(5, seed=7),
+                         small_network.get_flow_centrality(5))
+    
+    def test_optimized_centrality_full_sample_matches_exact(self):
+        """Test full sampling on a tree whose referrers are added after their referrals."""
+        for i in range(150):
+            self.network.add_user(i)
+        
+        # Binary tree rooted at 149, with every referrer inserted after its referrals
+        for h in range(1, 150):
+            self.network.add_referral(149 - (h - 1) // 2, 149 - h)
+        
+        exact = dict(self.network.get_flow_centrality(150))
+        sampled = self.network.get_flow_centrality_optimized(150, sample_ratio=1.0)
+        self.assertEqual(len(sampled), 150)
+        for user_id, score in sampled:
+            self.assertAlmostEqual(score, exact[user_id])
+        
     def test_large_network_performance(self):
         """Test performance with larger networks."""
         # Build larger network for performance testing
@@ -9,7 +9,7 @@ This test suite validates the network simulation functionality including:
 """
 
 import unittest
-from source.core.simulation import simulate_network_growth, days_to_target
+from source.core.simulation import simulate, simulate_total, simulate_network_growth, days_to_target
 from source.examples.adoption_functions import example_adoption_prob
 
 
@@ -131,8 +131,9 @@ class TestPart4NetworkSimulation(unittest.TestCase):
             max_days=30
         )
         
-        # Results should be consistent for same parameters
-        self.assertEqual(result1['success'], result2['success'])
+        # Results should be consistent for same parameters; the expected-value
+        # model is deterministic, so the whole result must match
+        self.assertEqual(result1, result2)
         
         # Test simulation monotonicity
         result_small = simulate_network_growth(
@@ -159,6 +160,42 @@ class TestPart4NetworkSimulation(unittest.TestCase):
             self.assertGreaterEqual(result1['days_taken'], 0)
             self.assertLessEqual(result1['days_taken'], 30)
     
+    def test_growth_rounding_ties(self):
+        """Test that per-user referral sums round the same way as a per-user loop."""
+        # 50 users at p=0.01 sum to just over 0.5, so one user joins each day
+        result = simulate_network_growth(
+            initial_users=50,
+            target_users=100,
+            adoption_prob=lambda x: 0.01,
+            max_days=1000
+        )
+        self.assertEqual(result, {'success': True, 'days_taken': 50, 'final_users': 100})
+        
+        self.assertEqual(days_to_target(50, 100, lambda x: min(1, x / 5000)), 50)
+        self.assertEqual(days_to_target(50, 51, lambda x: min(1, x / 5000)), 1)
+    
+    def test_simulate_capacity_limit(self):
+        """Test that cumulative referrals stop at the referrers' total capacity."""
+        result = simulate(0.1, 500)
+        self.assertEqual(len(result), 500)
+        self.assertAlmostEqual(result[0], 10.0)
+        self.assertAlmostEqual(result[-1], 1000.0)  # 100 referrers x 10 referrals
+        self.assertEqual(result[99], result[-1])
+        self.assertEqual(simulate_total(0.1, 500), result[-1])
+        
+        self.assertEqual(simulate(0.5, 0), [])
+        self.assertEqual(simulate_total(0.5, 0), 0.0)
+        
+        # Integer probabilities still give float totals
+        self.assertTrue(all(isinstance(total, float) for total in simulate(1, 5)))
+        self.assertIsInstance(simulate_total(1, 5), float)
+        
+        # Probabilities too small to ever exhaust capacity must not overflow
+        tiny = simulate(1e-310, 3)
+        self.assertEqual(len(tiny), 3)
+        self.assertTrue(0 < tiny[0] < tiny[1] < tiny[2])
+        self.assertEqual(simulate_total(1e-310, 3), tiny[-1])
+    
     def test_parameter_validation(self):
         """Test parameter validation in simulation functions."""
         # Test invalid initial users
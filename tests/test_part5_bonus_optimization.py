@@ -9,7 +9,7 @@ This test suite validates the bonus optimization functionality including:
 """
 
 import unittest
-from source.core.simulation import min_bonus_for_target
+from source.core.simulation import min_bonus_for_target, simulate_total, SimulationConfig
 from source.examples.adoption_functions import example_adoption_prob, create_test_adoption_prob
 
 
@@ -133,6 +133,28 @@ class TestPart5BonusOptimization(unittest.TestCase):
             self.assertIsInstance(min_bonus, float)
             self.assertGreater(min_bonus, 0.0)
     
+    def test_min_bonus_agrees_with_simulation(self):
+        """Test that the returned bonus is the smallest one the simulation accepts."""
+        linear_prob = lambda bonus: min(1.0, bonus / 1000)
+        cases = [
+            (15, 1050, example_adoption_prob),  # Above 1000: the last active day overshoots capacity
+            (8, 456, linear_prob),  # $570 falls 1 ulp short of the target in simulate_total
+        ]
+        
+        for days, target, adoption_prob in cases:
+            min_bonus = min_bonus_for_target(days, target, adoption_prob)
+            self.assertIsNotNone(min_bonus)
+            self.assertGreaterEqual(simulate_total(adoption_prob(min_bonus), days), target)
+            self.assertLess(simulate_total(adoption_prob(min_bonus - 10), days), target)
+        
+        # The referrer model comes from the config as well as the bonus grid
+        small_config = SimulationConfig(initial_referrers=50, referral_capacity=5, bonus_increment=25)
+        self.assertIsNotNone(min_bonus_for_target(365, 600, example_adoption_prob))
+        self.assertIsNone(min_bonus_for_target(365, 600, example_adoption_prob, config=small_config))
+        min_bonus = min_bonus_for_target(30, 100, example_adoption_prob, config=small_config)
+        self.assertEqual(min_bonus % 25, 0)
+        self.assertGreaterEqual(simulate_total(example_adoption_prob(min_bonus), 30, small_config), 100)
+    
     def test_integration_and_performance(self):
         """Test integration with other components and performance."""
         # Test integration with different adoption probability functions